@@ -0,0 +1,125 @@
+"""
+Daily ADR and booking-count anomaly detection
+Every series (e.g. hotel x market segment) is laid out as one row of a dense
+series x day matrix built with bincount; each day is compared with the
+rolling median and MAD of the preceding window, for all series at once
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from dates import keys_to_dates
+from outliers import MAD_SCALE
+
+WINDOW = 28
+MIN_PERIODS = 14
+THRESHOLD = 3.5
+# ADR anomalies need at least this many bookings on the day
+MIN_BOOKINGS = 3
+
+# Smallest spread used for the robust score of each metric, so flat stretches
+# do not turn every small change into an anomaly
+MIN_SCALE = {'adr': 1.0, 'bookings': 1.0}
+
+
+def daily_matrix(df, by, value='adr', day='status_key'):
+    """
+    Daily booking counts and mean value per series
+
+    Returns (series index, first day key, counts, means); counts and means have
+    shape (series, days), with NaN means on days without bookings.
+    """
+    grouped = df.groupby(list(by), sort=True, observed=True)
+    codes = grouped.ngroup().to_numpy(dtype=np.int64)
+    index = grouped.size().index
+
+    days = df[day].to_numpy(dtype=np.int64)
+    first = int(days.min())
+    n_days = int(days.max()) - first + 1
+    cells = codes * n_days + (days - first)
+    size = len(index) * n_days
+
+    counts = np.bincount(cells, minlength=size).reshape(len(index), n_days)
+    sums = np.bincount(cells, weights=df[value].to_numpy(dtype=np.float64), minlength=size).reshape(counts.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    return index, first, counts, means
+
+
+def _sorted_median(ordered, observed):
+    """Median of each sorted row over its first `observed` values (NaN sorts last)"""
+    rows = np.arange(len(ordered))
+    return (ordered[rows, np.maximum(observed - 1, 0) // 2] + ordered[rows, observed // 2]) / 2
+
+
+def rolling_robust(matrix, window=WINDOW, min_periods=MIN_PERIODS, where=None):
+    """
+    Median and MAD of the `window` days before each day, per row
+
+    Days with fewer than min_periods observed values in their window, and days
+    outside the optional `where` mask, get NaN; their windows are never sorted.
+    """
+    padded = np.concatenate([np.full((matrix.shape[0], window), np.nan, dtype=matrix.dtype), matrix], axis=1)
+    windows = sliding_window_view(padded, window, axis=1)[:, :-1]
+    # Observed values per window from a running count rather than a scan of every window
+    running = np.cumsum(~np.isnan(padded), axis=1)
+    observed = running[:, window - 1:-1] - np.concatenate(
+        [np.zeros((matrix.shape[0], 1), dtype=running.dtype), running[:, :matrix.shape[1] - 1]], axis=1
+    )
+
+    needed = observed >= min_periods
+    if where is not None:
+        needed &= where
+    series, day = np.nonzero(needed)
+    counts = observed[series, day]
+
+    # One gathered copy, sorted in place for the median and again for the MAD
+    ordered = windows[series, day]
+    ordered.sort(axis=1)
+    center = _sorted_median(ordered, counts)
+    np.abs(np.subtract(ordered, center[:, None], out=ordered), out=ordered)
+    ordered.sort(axis=1)
+
+    median, mad = np.full(matrix.shape, np.nan), np.full(matrix.shape, np.nan)
+    median[series, day] = center
+    mad[series, day] = _sorted_median(ordered, counts)
+    return median, mad
+
+
+def detect_anomalies(df, by=('hotel', 'market_segment'), window=WINDOW, threshold=THRESHOLD,
+                     min_bookings=MIN_BOOKINGS):
+    """
+    Days whose mean ADR or booking count deviates from the rolling baseline
+
+    Returns one row per anomaly with the series keys, date, metric, observed
+    value, expected (rolling median) value and robust z-score.
+    """
+    columns = [*by, 'date', 'metric', 'value', 'expected', 'score']
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    index, first, counts, means = daily_matrix(df, by)
+    # Counts are exact in float32, which sorts faster than float64
+    observed = {'adr': means, 'bookings': counts.astype(np.float32)}
+
+    anomalies = []
+    for metric, values in observed.items():
+        median, mad = rolling_robust(values, window, where=~np.isnan(values))
+        scale = np.maximum(MAD_SCALE * mad, MIN_SCALE[metric])
+        with np.errstate(invalid='ignore'):
+            score = (values - median) / scale
+            flagged = np.abs(score) > threshold
+        if metric == 'adr':
+            flagged &= counts >= min_bookings
+        series, offset = np.nonzero(flagged)
+        found = index[series].to_frame(index=False)
+        found['date'] = keys_to_dates(first + offset)
+        found['metric'] = metric
+        found['value'] = values[series, offset]
+        found['expected'] = median[series, offset]
+        found['score'] = score[series, offset]
+        anomalies.append(found)
+
+    result = pd.concat(anomalies, ignore_index=True)[columns]
+    return result.sort_values('score', key=np.abs, ascending=False).reset_index(drop=True)
@@ -1,11 +1,19 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+import charts
+import pipeline
+from anomalies import detect_anomalies
+from data_store import ensure_store, load_store, partitions
+from dates import dates_to_keys, keys_to_dates, months_between
+from distributions import merge, percentiles
+from drivers import DRIVER_COLUMNS, driver_table
+from export import FORMATS, cli_command, count_rows, export_chunks
+from figure_cache import ChartBatch, dataset_version
+from periods import compare, period_drivers, period_totals
+from validation import SchemaError
+
+DATA_FILE = 'hotel_booking.csv'
 
 # Page configuration
 st.set_page_config(
@@ -48,37 +56,267 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Load data with caching
-@st.cache_data
-def load_data():
-    df = pd.read_csv('hotel_booking.csv')
-    # Data cleaning
-    df['reservation_status_date'] = pd.to_datetime(df['reservation_status_date'], dayfirst=True)
-    df.drop(['company', 'agent'], axis=1, inplace=True)
-    df['children'].fillna(df['children'].median(), inplace=True)
-    df['country'].fillna('Unknown', inplace=True)
-    
-    # Handle outliers
-    Q1 = df['adr'].quantile(0.25)
-    Q3 = df['adr'].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-    df = df[(df['adr'] >= lower_bound) & (df['adr'] <= upper_bound)]
-    
-    # Add month column
-    df['month'] = df['reservation_status_date'].dt.month
-    df['year'] = df['reservation_status_date'].dt.year
-    
-    return df
+# Build the partitioned store from the shared pipeline once per dataset version
+@st.cache_resource
+def prepare_store(version):
+    ensure_store(DATA_FILE)
+    return partitions()
+
+# Columns each page reads from the store; anything else is loaded on demand
+PAGE_COLUMNS = {
+    "📈 Overview": ['hotel', 'is_canceled', 'adr'],
+    "🚫 Cancellation Analysis": ['is_canceled', 'month', 'lead_time'],
+    "💰 Revenue Insights": ['hotel', 'is_canceled', 'adr', 'status_key', 'year', 'market_segment'],
+    "🌍 Geographic Analysis": ['is_canceled', 'country'],
+    "📅 Seasonal Trends": ['is_canceled', 'adr', 'arrival_month', 'year'],
+    "🔗 Booking Channels": ['is_canceled', 'market_segment', 'distribution_channel'],
+    "⏳ Booking Pace": ['hotel', 'is_canceled', 'lead_time', 'arrival_key', 'status_key'],
+    "🧭 Cancellation Drivers": ['is_canceled'],
+}
+
+# Columns a page's data can be summarized by in an export
+# Row exports above this many bookings are left to export.py: download_button
+# keeps the whole encoded file in memory for the session
+MAX_EXPORT_ROWS = 250_000
+
+EXPORT_GROUPS = ['hotel', 'arrival_date_year', 'arrival_month', 'year', 'month', 'is_canceled',
+                 'market_segment', 'distribution_channel', 'customer_type', 'deposit_type', 'country']
+
+BREAKDOWN_LABELS = {
+    'hotel': "Hotel", 'is_canceled': "Booking Status", 'arrival_month': "Arrival Month",
+    'market_segment': "Market Segment", 'distribution_channel': "Distribution Channel",
+    'customer_type': "Customer Type", 'deposit_type': "Deposit Type", 'country': "Country",
+}
+
+# Read one column for the selected partitions; shared read-only across sessions
+@st.cache_resource(max_entries=256, show_spinner=False)
+def load_column(version, hotels, years, column, include_outliers):
+    return load_store(hotels=hotels, years=years, columns=[column], include_outliers=include_outliers)[column]
+
+# Project the selected partitions onto the requested columns without copying them
+def load_data(version, hotels, years, columns, include_outliers=False):
+    return pd.concat([load_column(version, hotels, years, column, include_outliers) for column in columns],
+                     axis=1, copy=False)
+
+# Daily ADR and booking-count anomalies for every hotel x market segment series
+@st.cache_data(show_spinner=False)
+def segment_anomalies(version, hotels, years, include_outliers):
+    columns = ['hotel', 'market_segment', 'status_key', 'adr']
+    return detect_anomalies(load_data(version, hotels, years, columns, include_outliers))
+
+# Lead time and ADR histograms, precomputed once; any filtered slice is merged from them
+@st.cache_resource
+def load_distributions(version, source=DATA_FILE):
+    return pipeline.run('distributions', source)
+
+# Histogram per cancellation status for the selected hotels and market segment, over the selected
+# years or the arrival months of a period; baseline reads the baseline dataset's histograms
+def status_histogram(metric, segment, period=None, baseline=False):
+    histograms = load_distributions(baseline_version, baseline_file) if baseline else load_distributions(data_version)
+    return merge(
+        histograms[metric],
+        hotel=selected_hotels,
+        arrival_date_year=range(selected_years[0], selected_years[1] + 1) if period is None else None,
+        months=None if period is None else months_between(*dates_to_keys(period)),
+        market_segment=None if segment == "All segments" else [segment],
+        is_outlier=None if include_outliers else [False]
+    )
+
+# Current and baseline period histograms per cancellation status
+def period_histograms(metric, segment):
+    return status_histogram(metric, segment, current_period), status_histogram(metric, segment, baseline_period, True)
+
+def segment_options(metric):
+    return ["All segments"] + sorted(load_distributions(data_version)[metric].index.unique('market_segment'))
+
+def percentile_table(histogram, metric):
+    return percentiles(histogram, metric).rename(index=charts.STATUS_NAMES).rename_axis("Status")
+
+# Score every feature value in one pass, once per dataset version and filter selection
+@st.cache_data(show_spinner=False)
+def driver_analysis(version, hotels, years, include_outliers):
+    return driver_table(load_data(version, hotels, years, DRIVER_COLUMNS, include_outliers))
+
+# Daily prefix sums per breakdown, precomputed once; a period's totals are one subtraction
+@st.cache_resource
+def load_period_cubes(version, source):
+    return pipeline.run('period_cubes', source)
+
+# Pick a date range; a half-picked range counts as a single day
+def period_input(label, default, bounds):
+    picked = st.sidebar.date_input(label, value=default, min_value=bounds[0], max_value=bounds[1])
+    return (picked[0], picked[-1]) if picked else default
+
+def period_label(period):
+    return f"{period[0]:%d %b %Y} – {period[1]:%d %b %Y}"
+
+# Current and baseline measures per breakdown value, merged from the period cubes
+def period_pair(breakdown):
+    return (
+        period_totals(current_cubes, breakdown, *dates_to_keys(current_period),
+                      hotels=selected_hotels, include_outliers=include_outliers),
+        period_totals(baseline_cubes, breakdown, *dates_to_keys(baseline_period),
+                      hotels=selected_hotels, include_outliers=include_outliers)
+    )
+
+# Both periods' KPIs per breakdown value, or overall when breakdown is None; built once per run
+comparisons = {}
+def comparison(breakdown=None):
+    if breakdown not in comparisons:
+        current, baseline = period_pair(breakdown or 'hotel')
+        if breakdown is None:
+            current, baseline = current.sum().to_frame("All").T, baseline.sum().to_frame("All").T
+        comparisons[breakdown] = compare(current, baseline)
+    return comparisons[breakdown]
+
+# (current, baseline, change) of a metric overall or for one breakdown value; None unless comparing.
+# The 'values' metric counts the breakdown's values with bookings
+def compared(metric, breakdown=None, value="All"):
+    if not compare_periods:
+        return None
+    table = comparison(breakdown)
+    if metric == 'values':
+        current, baseline = (int((table[('bookings', period)] > 0).sum()) for period in ('current', 'baseline'))
+        return current, baseline, current - baseline
+    cell = table[metric].reindex([value]).iloc[0]
+    return cell['current'], cell['baseline'], cell['delta']
+
+# Change between two compared differences, e.g. cancelled minus kept bookings
+def difference(first, second):
+    if first is None:
+        return None
+    current, baseline = first[0] - second[0], first[1] - second[1]
+    return current, baseline, current - baseline
+
+# A page figure: the current period's value when comparing, else the value from the loaded rows
+def current_value(value, cell):
+    return value if cell is None else cell[0]
+
+# Driver scores of both periods side by side, with the change in rate, lift and impact
+def driver_comparison(current, baseline):
+    table = current.merge(baseline, on=['feature', 'value'], how='outer', suffixes=('', '_baseline'))
+    for column in ('cancel_rate', 'lift', 'impact'):
+        table[f'{column}_delta'] = table[column] - table[f'{column}_baseline']
+    return table
+
+# A page metric; when comparing periods it shows the compared cell with its baseline value and change
+def kpi(label, value, value_format, delta_format, delta_color="normal", compared=None):
+    current = current_value(value, compared)
+    shown = value_format.format(current) if pd.notna(current) else "–"
+    if compared is None:
+        st.metric(label, shown)
+        return
+    _, baseline, delta = compared
+    st.metric(label, shown, delta_format.format(delta) if pd.notna(delta) else None, delta_color=delta_color)
+    st.caption(f"Baseline: {value_format.format(baseline) if pd.notna(baseline) else '–'}")
+
+# Mean ADR of the bookings with a cancellation status
+def status_adr(rows, status):
+    return rows[rows['is_canceled'] == status]['adr'].mean()
+
+# Days by which cancelled bookings are made earlier than kept ones
+def lead_time_gap(rows):
+    return rows[rows['is_canceled'] == 1]['lead_time'].mean() - rows[rows['is_canceled'] == 0]['lead_time'].mean()
+
+# " (baseline: value, change)" after an inline figure when comparing periods, else nothing
+def baseline_note(cell, value_format, delta_format):
+    if cell is None:
+        return ""
+    current, baseline, delta = cell
+    if pd.isna(baseline):
+        return " (baseline: –)"
+    change = delta_format.format(delta) if pd.notna(delta) else "–"
+    return f" (baseline: {value_format.format(baseline)}, {change})"
+
+# Percentile table of a distribution; when comparing periods it lists both periods and the change
+def percentile_frame(histogram, baseline_histogram, metric, value_format):
+    table = percentile_table(histogram, metric)
+    if baseline_histogram is not None:
+        baseline = percentile_table(baseline_histogram, metric)
+        table = pd.concat({"Current": table, "Baseline": baseline, "Change": table - baseline}, names=["Period"])
+    st.dataframe(table.style.format(value_format), use_container_width=True)
+
+# Declare a page chart. When comparing periods, charts of a breakdown are replaced by one current vs
+# baseline chart per breakdown and metrics (with its table below the first), and distribution charts
+# are drawn for both periods side by side
+drawn_comparisons = set()
+def add_chart(chart_id, build, data=None, baseline_data=None, breakdown=None, metrics=('cancel_rate', 'adr'),
+              **kwargs):
+    if not compare_periods:
+        page_charts.add(chart_id, build, data=data, **kwargs)
+    elif breakdown is not None:
+        if (breakdown, metrics) in drawn_comparisons:
+            return
+        first = breakdown not in {shown for shown, _ in drawn_comparisons}
+        drawn_comparisons.add((breakdown, metrics))
+        page_charts.add(
+            f'period_comparison:{breakdown}:{",".join(metrics)}:{baseline_version}:{baseline_period}',
+            lambda table: charts.period_comparison(table, metrics), data=comparison(breakdown), **kwargs
+        )
+        if first:
+            label = BREAKDOWN_LABELS[breakdown]
+            with st.expander(f"📋 {label}: current vs baseline"):
+                st.dataframe(comparison_frame(comparison(breakdown)),
+                             column_config={**COMPARISON_COLUMNS, 'value': label},
+                             hide_index=True, use_container_width=True)
+    elif baseline_data is not None:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption(f"Current: {period_label(current_period)}")
+            page_charts.add(chart_id, build, data=data, **kwargs)
+        with col2:
+            st.caption(f"Baseline: {baseline_name}")
+            page_charts.add(f'{chart_id}:baseline:{baseline_version}:{baseline_period}', build,
+                            data=baseline_data, **kwargs)
+    else:
+        page_charts.add(f'{chart_id}:{baseline_version}:{baseline_period}', build, data=data, **kwargs)
+
+# Flatten a comparison table's (metric, period) columns for display
+def comparison_frame(table):
+    frame = table.copy()
+    frame.columns = [f"{metric}_{period}" for metric, period in frame.columns]
+    if frame.index.name == 'is_canceled':
+        frame.index = frame.index.map(charts.STATUS_NAMES)
+    return frame.rename_axis("value").reset_index()
+
+COMPARISON_COLUMNS = {
+    'value': "Value",
+    'bookings_current': st.column_config.NumberColumn("Bookings", format="%d"),
+    'bookings_baseline': st.column_config.NumberColumn("Bookings (Baseline)", format="%d"),
+    'bookings_delta': st.column_config.NumberColumn("Δ Bookings", format="%+d"),
+    'cancellations_current': st.column_config.NumberColumn("Cancellations", format="%d"),
+    'cancellations_baseline': st.column_config.NumberColumn("Cancellations (Baseline)", format="%d"),
+    'cancellations_delta': st.column_config.NumberColumn("Δ Cancellations", format="%+d"),
+    'cancel_rate_current': st.column_config.NumberColumn("Cancellation Rate (%)", format="%.1f"),
+    'cancel_rate_baseline': st.column_config.NumberColumn("Cancellation Rate (Baseline)", format="%.1f"),
+    'cancel_rate_delta': st.column_config.NumberColumn("Δ Rate (pp)", format="%+.1f"),
+    'adr_current': st.column_config.NumberColumn("ADR ($)", format="%.2f"),
+    'adr_baseline': st.column_config.NumberColumn("ADR (Baseline)", format="%.2f"),
+    'adr_delta': st.column_config.NumberColumn("Δ ADR", format="%+.2f"),
+    'lead_time_current': st.column_config.NumberColumn("Lead Time (days)", format="%.0f"),
+    'lead_time_baseline': st.column_config.NumberColumn("Lead Time (Baseline)", format="%.0f"),
+    'lead_time_delta': st.column_config.NumberColumn("Δ Lead Time", format="%+.0f"),
+}
+
+# Rows rejected by validation, written to a quarantine file with their reasons
+@st.cache_resource
+def data_quality(version):
+    return pipeline.run('quarantine', DATA_FILE)
 
 # Load data
+data_loaded = False
 try:
-    df = load_data()
-    data_loaded = True
-except:
-    data_loaded = False
+    data_version = dataset_version(DATA_FILE)
+    available_partitions = prepare_store(data_version)
+    quality = data_quality(data_version)
+    data_loaded = bool(available_partitions)
+    if not data_loaded:
+        st.error(f"⚠️ No valid bookings in '{DATA_FILE}': all {quality['rejected_rows']:,} rows were quarantined "
+                 f"(see {quality['path']}).")
+except FileNotFoundError:
     st.error("⚠️ Please ensure 'hotel_booking.csv' is in the same directory as this app.")
+except SchemaError as e:
+    st.error(f"⚠️ {e}")
 
 # Header
 st.markdown('<p class="main-header">🏨 Hotel Booking Analysis Dashboard</p>', unsafe_allow_html=True)
@@ -93,14 +331,106 @@ if data_loaded:
         "💰 Revenue Insights",
         "🌍 Geographic Analysis",
         "📅 Seasonal Trends",
-        "🔗 Booking Channels"
+        "🔗 Booking Channels",
+        "⏳ Booking Pace",
+        "🧭 Cancellation Drivers"
     ])
     
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 🔎 Filters")
+    hotel_options = sorted({hotel for hotel, _ in available_partitions})
+    year_options = sorted({year for _, year in available_partitions})
+    selected_hotels = st.sidebar.multiselect("Hotel", hotel_options, default=hotel_options)
+    if len(year_options) > 1:
+        selected_years = st.sidebar.select_slider(
+            "Arrival Year", options=year_options, value=(year_options[0], year_options[-1])
+        )
+    else:
+        selected_years = (year_options[0], year_options[-1])
+    include_outliers = st.sidebar.checkbox("Include ADR outliers", value=False,
+                                           help="ADR outside the IQR bounds of its hotel and arrival month")
+    filters = {'hotels': selected_hotels, 'years': list(selected_years), 'include_outliers': include_outliers}
+    
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 🔁 Compare Periods")
+    compare_periods = st.sidebar.checkbox("Compare two periods", value=False,
+                                          help="Arrival date ranges; replaces the year filter for the comparison")
+    if compare_periods:
+        current_cubes = load_period_cubes(data_version, DATA_FILE)
+        first_day, last_day = keys_to_dates(
+            [current_cubes['first_key'], current_cubes['first_key'] + current_cubes['n_days'] - 1]
+        ).astype('datetime64[D]').tolist()
+        bounds = (first_day, last_day)
+        year = pd.Timedelta(days=364)
+        current_period = period_input("Current period", (max(first_day, last_day - year), last_day), bounds)
+        baseline_source = st.sidebar.radio("Compare against", ["Earlier period", "Dataset snapshot"],
+                                           key="baseline_source")
+        if baseline_source == "Earlier period":
+            baseline_file, baseline_version = DATA_FILE, data_version
+            baseline_cubes = current_cubes
+            baseline_end = max(first_day, current_period[0] - pd.Timedelta(days=1))
+            baseline_period = period_input("Baseline period", (max(first_day, baseline_end - year), baseline_end),
+                                           bounds)
+        else:
+            snapshot_file = st.sidebar.text_input("Snapshot CSV", value="hotel_booking_previous.csv")
+            baseline_period = current_period
+            try:
+                baseline_file, baseline_version = snapshot_file, dataset_version(snapshot_file)
+                baseline_cubes = load_period_cubes(baseline_version, snapshot_file)
+            except (FileNotFoundError, SchemaError) as e:
+                st.sidebar.warning(f"⚠️ Snapshot unavailable: {e}")
+                compare_periods = False
+    
+    df = load_data(data_version, tuple(selected_hotels), tuple(selected_years), PAGE_COLUMNS[page], include_outliers)
+    if df.empty:
+        st.warning("No bookings match the selected filters.")
+        st.stop()
+    if compare_periods and not comparison()[('bookings', 'current')].iloc[0]:
+        st.warning("No bookings in the current period match the selected filters.")
+        st.stop()
+    
     st.sidebar.markdown("---")
     st.sidebar.markdown("### 📋 Dataset Info")
     st.sidebar.metric("Total Records", f"{len(df):,}")
-    st.sidebar.metric("Date Range", f"{df['reservation_status_date'].min().year} - {df['reservation_status_date'].max().year}")
-    st.sidebar.metric("Countries", df['country'].nunique())
+    info = load_data(data_version, tuple(selected_hotels), tuple(selected_years), ['year', 'country'], include_outliers)
+    st.sidebar.metric("Date Range", f"{info['year'].min()} - {info['year'].max()}")
+    st.sidebar.metric("Countries", info['country'].nunique())
+    
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 🧪 Data Quality")
+    st.sidebar.metric("Valid Rows", f"{quality['valid_rows']:,}")
+    st.sidebar.metric("Quarantined Rows", f"{quality['rejected_rows']:,}")
+    outliers = load_column(data_version, tuple(selected_hotels), tuple(selected_years), 'is_outlier', True)
+    st.sidebar.metric("ADR Outliers Flagged", f"{int(outliers.sum()):,}")
+    if quality['rejected_rows']:
+        with st.sidebar.expander("Rejection reasons"):
+            st.dataframe(quality['reasons'], use_container_width=True)
+            st.caption(f"Rejected rows: `{quality['path']}`")
+    
+    st.sidebar.markdown("---")
+    concurrent_charts = st.sidebar.checkbox("⚡ Build charts concurrently", value=True)
+    if compare_periods:
+        page_charts = ChartBatch(page, df, data_version, {**filters, 'period': current_period},
+                                 concurrent=concurrent_charts)
+    else:
+        page_charts = ChartBatch(page, df, data_version, filters, concurrent=concurrent_charts)
+    
+    # Both periods and, beside the Overview's own KPIs, their overall KPIs with the change
+    if compare_periods:
+        baseline_name = (period_label(baseline_period) if baseline_source == "Earlier period"
+                         else f"{snapshot_file} ({period_label(baseline_period)})")
+        st.header(f"🔁 {period_label(current_period)} vs {baseline_name}")
+        if page != "📈 Overview":
+            kpi_cards = [
+                ("Total Bookings", 'bookings', "{:,.0f}", "{:+,.0f}", "normal"),
+                ("Cancellation Rate", 'cancel_rate', "{:.1f}%", "{:+.1f} pp", "inverse"),
+                ("Avg Daily Rate", 'adr', "${:.2f}", "{:+.2f}", "normal"),
+                ("Avg Lead Time", 'lead_time', "{:.0f} days", "{:+.0f} days", "off"),
+            ]
+            for col, (label, metric, value_format, delta_format, delta_color) in zip(st.columns(4), kpi_cards):
+                with col:
+                    kpi(label, None, value_format, delta_format, delta_color, compared(metric))
+        st.markdown("---")
     
     # Overview Page
     if page == "📈 Overview":
@@ -109,29 +439,26 @@ if data_loaded:
         # Key Metrics
         col1, col2, col3, col4 = st.columns(4)
         
-        total_bookings = len(df)
-        cancelled_bookings = df['is_canceled'].sum()
-        cancellation_rate = (cancelled_bookings / total_bookings) * 100
-        avg_adr = df['adr'].mean()
-        
         with col1:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Total Bookings", f"{total_bookings:,}")
+            kpi("Total Bookings", len(df), "{:,.0f}", "{:+,.0f}", compared=compared('bookings'))
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col2:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Cancellation Rate", f"{cancellation_rate:.1f}%")
+            kpi("Cancellation Rate", df['is_canceled'].mean() * 100, "{:.1f}%", "{:+.1f} pp",
+                delta_color="inverse", compared=compared('cancel_rate'))
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col3:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Avg Daily Rate", f"${avg_adr:.2f}")
+            kpi("Avg Daily Rate", df['adr'].mean(), "${:.2f}", "{:+.2f}", compared=compared('adr'))
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col4:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Hotel Types", "2")
+            kpi("Hotel Types", df['hotel'].nunique(), "{}", "{:+}", delta_color="off",
+                compared=compared('values', 'hotel'))
             st.markdown('</div>', unsafe_allow_html=True)
         
         st.markdown("---")
@@ -156,23 +483,8 @@ if data_loaded:
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=['Not Cancelled', 'Cancelled'],
-                    y=df['is_canceled'].value_counts().sort_index(),
-                    marker_color=['#2ecc71', '#e74c3c'],
-                    text=df['is_canceled'].value_counts().sort_index(),
-                    textposition='auto',
-                )
-            ])
-            fig.update_layout(
-                title="Booking Status Distribution",
-                xaxis_title="Status",
-                yaxis_title="Number of Bookings",
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            add_chart('status_distribution', charts.status_distribution, breakdown='is_canceled',
+                      metrics=('bookings',), use_container_width=True)
         
         with col2:
             st.markdown('<div class="insight-box">', unsafe_allow_html=True)
@@ -196,30 +508,22 @@ if data_loaded:
         # Hotel Type Comparison
         st.subheader("🏨 Hotel Type Performance")
         
-        hotel_cancel = df.groupby(['hotel', 'is_canceled']).size().reset_index(name='count')
-        
-        fig = px.bar(
-            hotel_cancel,
-            x='hotel',
-            y='count',
-            color='is_canceled',
-            barmode='group',
-            labels={'is_canceled': 'Status', 'count': 'Number of Bookings', 'hotel': 'Hotel Type'},
-            color_discrete_map={0: '#2ecc71', 1: '#e74c3c'},
-            title="Bookings by Hotel Type and Status"
-        )
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        add_chart('hotel_status', charts.hotel_status, breakdown='hotel', metrics=('bookings', 'cancel_rate'),
+                  use_container_width=True)
         
         col1, col2 = st.columns(2)
         
         with col1:
-            resort_cancel_rate = df[df['hotel']=='Resort Hotel']['is_canceled'].mean() * 100
-            st.info(f"🏖️ **Resort Hotel:** {resort_cancel_rate:.1f}% cancellation rate")
+            resort = compared('cancel_rate', 'hotel', 'Resort Hotel')
+            resort_cancel_rate = current_value(df[df['hotel']=='Resort Hotel']['is_canceled'].mean() * 100, resort)
+            st.info(f"🏖️ **Resort Hotel:** {resort_cancel_rate:.1f}% cancellation rate"
+                    + baseline_note(resort, "{:.1f}%", "{:+.1f} pp"))
         
         with col2:
-            city_cancel_rate = df[df['hotel']=='City Hotel']['is_canceled'].mean() * 100
-            st.warning(f"🏙️ **City Hotel:** {city_cancel_rate:.1f}% cancellation rate")
+            city = compared('cancel_rate', 'hotel', 'City Hotel')
+            city_cancel_rate = current_value(df[df['hotel']=='City Hotel']['is_canceled'].mean() * 100, city)
+            st.warning(f"🏙️ **City Hotel:** {city_cancel_rate:.1f}% cancellation rate"
+                       + baseline_note(city, "{:.1f}%", "{:+.1f} pp"))
     
     # Cancellation Analysis Page
     elif page == "🚫 Cancellation Analysis":
@@ -235,21 +539,8 @@ if data_loaded:
         # Monthly Cancellation Trends
         st.subheader("📅 Monthly Cancellation Patterns")
         
-        monthly_cancel = df.groupby(['month', 'is_canceled']).size().reset_index(name='count')
-        
-        fig = px.line(
-            monthly_cancel,
-            x='month',
-            y='count',
-            color='is_canceled',
-            markers=True,
-            labels={'month': 'Month', 'count': 'Number of Bookings', 'is_canceled': 'Status'},
-            color_discrete_map={0: '#2ecc71', 1: '#e74c3c'},
-            title="Monthly Booking Trends: Cancelled vs Not Cancelled"
-        )
-        fig.update_xaxes(tickmode='linear', dtick=1)
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        add_chart('monthly_cancellations', charts.monthly_cancellations, breakdown='arrival_month',
+                  metrics=('cancellations', 'cancel_rate'), use_container_width=True)
         
         st.markdown('<div class="insight-box">', unsafe_allow_html=True)
         st.markdown("""
@@ -267,32 +558,18 @@ if data_loaded:
         col1, col2 = st.columns(2)
         
         with col1:
-            cancelled_lead = df[df['is_canceled']==1]['lead_time'].mean()
-            not_cancelled_lead = df[df['is_canceled']==0]['lead_time'].mean()
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=['Cancelled', 'Not Cancelled'],
-                    y=[cancelled_lead, not_cancelled_lead],
-                    marker_color=['#e74c3c', '#2ecc71'],
-                    text=[f"{cancelled_lead:.0f} days", f"{not_cancelled_lead:.0f} days"],
-                    textposition='auto',
-                )
-            ])
-            fig.update_layout(
-                title="Average Lead Time (Days Before Arrival)",
-                yaxis_title="Days",
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            add_chart('lead_time_means', charts.lead_time_means, breakdown='is_canceled', metrics=('lead_time',),
+                      use_container_width=True)
         
         with col2:
+            gap = difference(compared('lead_time', 'is_canceled', 1), compared('lead_time', 'is_canceled', 0))
+            lead_time_days = current_value(lead_time_gap(df), gap)
+            lead_time_change = baseline_note(gap, "{:.0f} days", "{:+.0f} days")
             st.markdown('<div class="insight-box">', unsafe_allow_html=True)
             st.markdown(f"""
             **🔍 Key Finding:**
             
-            Cancelled bookings are made **{cancelled_lead - not_cancelled_lead:.0f} days earlier** on average.
+            Cancelled bookings are made **{lead_time_days:.0f} days earlier** on average{lead_time_change}.
             
             **Why This Matters:**
             - Early bookings have higher uncertainty
@@ -305,6 +582,22 @@ if data_loaded:
             - Implement flexible rebooking options
             """)
             st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Lead Time Distribution
+        st.subheader("📊 Lead Time Distribution")
+        
+        lead_segment = st.selectbox("Market Segment", segment_options('lead_time'), key="lead_time_segment")
+        if compare_periods:
+            lead_hist, baseline_lead_hist = period_histograms('lead_time', lead_segment)
+            st.caption("Distributions cover whole arrival months: every month the periods overlap.")
+        else:
+            lead_hist, baseline_lead_hist = status_histogram('lead_time', lead_segment), None
+        
+        add_chart(f'lead_time_distribution:{lead_segment}', charts.lead_time_distribution,
+                  data=lead_hist, baseline_data=baseline_lead_hist, use_container_width=True)
+        
+        st.markdown("**Lead time percentiles (days):**")
+        percentile_frame(lead_hist, baseline_lead_hist, 'lead_time', "{:.0f}")
     
     # Revenue Insights Page
     elif page == "💰 Revenue Insights":
@@ -319,62 +612,26 @@ if data_loaded:
         # ADR Comparison
         st.subheader("💵 Average Daily Rate (ADR) Comparison")
         
-        # Filter data for 2016-2017
-        cancelled_data = df[df['is_canceled'] == 1]
-        not_cancelled_data = df[df['is_canceled'] == 0]
-        
-        cancelled_data_filtered = cancelled_data[
-            (cancelled_data['reservation_status_date'].dt.year >= 2016) & 
-            (cancelled_data['reservation_status_date'].dt.year <= 2017)
-        ]
-        not_cancelled_data_filtered = not_cancelled_data[
-            (not_cancelled_data['reservation_status_date'].dt.year >= 2016) & 
-            (not_cancelled_data['reservation_status_date'].dt.year <= 2017)
-        ]
-        
-        cancelled_adr = cancelled_data_filtered.groupby('reservation_status_date')['adr'].mean().reset_index()
-        not_cancelled_adr = not_cancelled_data_filtered.groupby('reservation_status_date')['adr'].mean().reset_index()
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=not_cancelled_adr['reservation_status_date'],
-            y=not_cancelled_adr['adr'],
-            mode='lines',
-            name='Not Cancelled',
-            line=dict(color='#2ecc71', width=2),
-            fill='tonexty'
-        ))
-        fig.add_trace(go.Scatter(
-            x=cancelled_adr['reservation_status_date'],
-            y=cancelled_adr['adr'],
-            mode='lines',
-            name='Cancelled',
-            line=dict(color='#e74c3c', width=2),
-            fill='tonexty'
-        ))
-        
-        fig.update_layout(
-            title="Average Daily Rate Over Time (2016-2017): Cancelled vs Not Cancelled",
-            xaxis_title="Date",
-            yaxis_title="Average Daily Rate ($)",
-            height=500,
-            hovermode='x unified'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        add_chart('adr_by_status', charts.adr_by_status, breakdown='is_canceled', metrics=('adr',),
+                  use_container_width=True)
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            avg_cancelled_adr = cancelled_data['adr'].mean()
-            st.metric("Avg ADR (Cancelled)", f"${avg_cancelled_adr:.2f}")
+            cancelled_adr = compared('adr', 'is_canceled', 1)
+            kpi("Avg ADR (Cancelled)", status_adr(df, 1), "${:.2f}", "{:+.2f}", compared=cancelled_adr)
         
         with col2:
-            avg_not_cancelled_adr = not_cancelled_data['adr'].mean()
-            st.metric("Avg ADR (Not Cancelled)", f"${avg_not_cancelled_adr:.2f}")
+            kept_adr = compared('adr', 'is_canceled', 0)
+            kpi("Avg ADR (Not Cancelled)", status_adr(df, 0), "${:.2f}", "{:+.2f}", compared=kept_adr)
         
         with col3:
-            diff = avg_cancelled_adr - avg_not_cancelled_adr
-            st.metric("Difference", f"${diff:.2f}", delta=f"{(diff/avg_not_cancelled_adr*100):.1f}%")
+            if compare_periods:
+                kpi("Difference", None, "${:.2f}", "{:+.2f}", compared=difference(cancelled_adr, kept_adr))
+            else:
+                avg_cancelled_adr, avg_not_cancelled_adr = status_adr(df, 1), status_adr(df, 0)
+                diff = avg_cancelled_adr - avg_not_cancelled_adr
+                st.metric("Difference", f"${diff:.2f}", delta=f"{(diff/avg_not_cancelled_adr*100):.1f}%")
         
         st.markdown('<div class="insight-box">', unsafe_allow_html=True)
         st.markdown("""
@@ -394,36 +651,67 @@ if data_loaded:
         """)
         st.markdown('</div>', unsafe_allow_html=True)
         
+        # ADR Distribution
+        st.subheader("📊 ADR Distribution")
+        
+        adr_segment = st.selectbox("Market Segment", segment_options('adr'), key="adr_segment")
+        if compare_periods:
+            adr_hist, baseline_adr_hist = period_histograms('adr', adr_segment)
+            st.caption("Distributions cover whole arrival months: every month the periods overlap.")
+        else:
+            adr_hist, baseline_adr_hist = status_histogram('adr', adr_segment), None
+        
+        add_chart(f'adr_distribution:{adr_segment}', charts.adr_distribution,
+                  data=adr_hist, baseline_data=baseline_adr_hist, use_container_width=True)
+        
+        st.markdown("**ADR percentiles ($):**")
+        percentile_frame(adr_hist, baseline_adr_hist, 'adr', "${:.2f}")
+        
         # Hotel Type ADR
         st.subheader("🏨 Pricing by Hotel Type")
         
-        resort_adr = df[df['hotel']=='Resort Hotel'].groupby('reservation_status_date')['adr'].mean().reset_index()
-        city_adr = df[df['hotel']=='City Hotel'].groupby('reservation_status_date')['adr'].mean().reset_index()
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=resort_adr['reservation_status_date'],
-            y=resort_adr['adr'],
-            mode='lines',
-            name='Resort Hotel',
-            line=dict(color='#3498db', width=2)
-        ))
-        fig.add_trace(go.Scatter(
-            x=city_adr['reservation_status_date'],
-            y=city_adr['adr'],
-            mode='lines',
-            name='City Hotel',
-            line=dict(color='#f39c12', width=2)
-        ))
-        
-        fig.update_layout(
-            title="Average Daily Rate by Hotel Type Over Time",
-            xaxis_title="Date",
-            yaxis_title="Average Daily Rate ($)",
-            height=500,
-            hovermode='x unified'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        add_chart('adr_by_hotel', charts.adr_by_hotel, breakdown='hotel', metrics=('adr',), use_container_width=True)
+        
+        # ADR Anomalies
+        st.subheader("🚨 Pricing & Demand Anomalies")
+        
+        st.markdown("""
+        Each day's mean ADR and booking count per hotel and market segment is compared with the median of
+        the previous four weeks. Days that deviate by more than 3.5 robust standard deviations (MAD) are listed below;
+        ADR anomalies are also marked with ✖ on the charts above.
+        """)
+        
+        if compare_periods:
+            # Anomalies are events, detected over every arrival year and listed for the current period only
+            anomalies = segment_anomalies(data_version, tuple(selected_hotels), (year_options[0], year_options[-1]),
+                                          include_outliers)
+            anomaly_dates = pd.to_datetime(anomalies['date'])
+            anomalies = anomalies[(anomaly_dates >= pd.Timestamp(current_period[0]))
+                                  & (anomaly_dates <= pd.Timestamp(current_period[1]))]
+        else:
+            anomalies = segment_anomalies(data_version, tuple(selected_hotels), tuple(selected_years),
+                                          include_outliers)
+        anomaly_metric = st.radio("Metric", ["All", "ADR", "Bookings"], horizontal=True, key="anomaly_metric")
+        if anomaly_metric != "All":
+            anomalies = anomalies[anomalies['metric'] == anomaly_metric.lower()]
+        
+        if anomalies.empty:
+            st.info("No anomalies found for the current selection.")
+        else:
+            st.dataframe(
+                anomalies,
+                column_config={
+                    'hotel': "Hotel",
+                    'market_segment': "Market Segment",
+                    'date': st.column_config.DateColumn("Date"),
+                    'metric': "Metric",
+                    'value': st.column_config.NumberColumn("Observed", format="%.2f"),
+                    'expected': st.column_config.NumberColumn("Expected", format="%.2f"),
+                    'score': st.column_config.NumberColumn("Robust Z-Score", format="%+.1f"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
     
     # Geographic Analysis Page
     elif page == "🌍 Geographic Analysis":
@@ -438,28 +726,24 @@ if data_loaded:
         # Top Countries with Cancellations
         st.subheader("🌍 Top 10 Countries with Highest Cancellations")
         
-        top_countries = df[df['is_canceled']==1]['country'].value_counts().head(10)
+        if compare_periods:
+            country_cancellations = comparison('country')[('cancellations', 'current')].drop("Other", errors='ignore')
+            top_countries = country_cancellations.sort_values(ascending=False).head(10)
+        else:
+            top_countries = df[df['is_canceled']==1]['country'].value_counts().head(10)
         
         col1, col2 = st.columns([3, 2])
         
         with col1:
-            fig = go.Figure(data=[go.Pie(
-                labels=top_countries.index,
-                values=top_countries.values,
-                hole=.3,
-                marker_colors=px.colors.qualitative.Set3
-            )])
-            fig.update_layout(
-                title="Distribution of Cancelled Bookings by Country",
-                height=500
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            add_chart('top_country_cancellations', charts.top_country_cancellations, breakdown='country',
+                      metrics=('cancellations',), use_container_width=True)
         
         with col2:
             st.markdown("### 📊 Top Countries")
             for i, (country, count) in enumerate(top_countries.items(), 1):
                 percentage = (count / top_countries.sum()) * 100
-                st.markdown(f"**{i}. {country}:** {count:,} cancellations ({percentage:.1f}%)")
+                st.markdown(f"**{i}. {country}:** {count:,.0f} cancellations ({percentage:.1f}%)"
+                            + baseline_note(compared('cancellations', 'country', country), "{:,.0f}", "{:+,.0f}"))
         
         st.markdown('<div class="insight-box">', unsafe_allow_html=True)
         st.markdown(f"""
@@ -483,24 +767,8 @@ if data_loaded:
         # Cancellation Rate by Country
         st.subheader("📈 Cancellation Rate by Top Countries")
         
-        top_countries_all = df['country'].value_counts().head(10).index
-        country_cancel_rate = df[df['country'].isin(top_countries_all)].groupby('country')['is_canceled'].agg(['mean', 'count']).reset_index()
-        country_cancel_rate['mean'] = country_cancel_rate['mean'] * 100
-        country_cancel_rate = country_cancel_rate.sort_values('mean', ascending=False)
-        
-        fig = px.bar(
-            country_cancel_rate,
-            x='country',
-            y='mean',
-            text='mean',
-            labels={'mean': 'Cancellation Rate (%)', 'country': 'Country'},
-            title="Cancellation Rate by Country (Top 10 Booking Countries)",
-            color='mean',
-            color_continuous_scale='Reds'
-        )
-        fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-        fig.update_layout(height=500, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        add_chart('country_cancel_rate', charts.country_cancel_rate, breakdown='country', metrics=('cancel_rate',),
+                  use_container_width=True)
     
     # Seasonal Trends Page
     elif page == "📅 Seasonal Trends":
@@ -515,25 +783,8 @@ if data_loaded:
         # Monthly ADR by Cancellation Status
         st.subheader("💰 Monthly Revenue Patterns")
         
-        monthly_adr = df[df['is_canceled']==1].groupby('arrival_date_month')['adr'].sum().reset_index()
-        
-        # Sort by month order
-        month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
-                      'July', 'August', 'September', 'October', 'November', 'December']
-        monthly_adr['arrival_date_month'] = pd.Categorical(monthly_adr['arrival_date_month'], categories=month_order, ordered=True)
-        monthly_adr = monthly_adr.sort_values('arrival_date_month')
-        
-        fig = px.bar(
-            monthly_adr,
-            x='arrival_date_month',
-            y='adr',
-            title="Total ADR by Month (Cancelled Bookings Only)",
-            labels={'arrival_date_month': 'Month', 'adr': 'Total ADR ($)'},
-            color='adr',
-            color_continuous_scale='Reds'
-        )
-        fig.update_layout(height=500, xaxis_tickangle=-45)
-        st.plotly_chart(fig, use_container_width=True)
+        add_chart('monthly_cancelled_adr', charts.monthly_cancelled_adr, breakdown='arrival_month',
+                  metrics=('adr', 'cancellations'), use_container_width=True)
         
         st.markdown('<div class="insight-box">', unsafe_allow_html=True)
         st.markdown("""
@@ -551,20 +802,8 @@ if data_loaded:
         # Year-over-year comparison
         st.subheader("📊 Year-over-Year Booking Trends")
         
-        yearly_bookings = df.groupby(['year', 'is_canceled']).size().reset_index(name='count')
-        
-        fig = px.bar(
-            yearly_bookings,
-            x='year',
-            y='count',
-            color='is_canceled',
-            barmode='group',
-            labels={'is_canceled': 'Status', 'count': 'Number of Bookings', 'year': 'Year'},
-            color_discrete_map={0: '#2ecc71', 1: '#e74c3c'},
-            title="Annual Booking Trends"
-        )
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        add_chart('yearly_bookings', charts.yearly_bookings, breakdown='arrival_month', metrics=('bookings',),
+                  use_container_width=True)
     
     # Booking Channels Page
     elif page == "🔗 Booking Channels":
@@ -583,28 +822,13 @@ if data_loaded:
         
         with col1:
             st.markdown("#### All Bookings")
-            market_all = df['market_segment'].value_counts()
-            
-            fig = go.Figure(data=[go.Pie(
-                labels=market_all.index,
-                values=market_all.values,
-                hole=.3
-            )])
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            add_chart('market_segment_all', charts.market_segment_all, breakdown='market_segment',
+                      metrics=('bookings',), use_container_width=True)
         
         with col2:
             st.markdown("#### Cancelled Bookings Only")
-            market_cancelled = df[df['is_canceled']==1]['market_segment'].value_counts()
-            
-            fig = go.Figure(data=[go.Pie(
-                labels=market_cancelled.index,
-                values=market_cancelled.values,
-                hole=.3,
-                marker_colors=px.colors.qualitative.Set3
-            )])
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            add_chart('market_segment_cancelled', charts.market_segment_cancelled, breakdown='market_segment',
+                      metrics=('cancellations',), use_container_width=True)
         
         st.markdown('<div class="insight-box">', unsafe_allow_html=True)
         st.markdown("""
@@ -630,42 +854,172 @@ if data_loaded:
         # Cancellation Rate by Segment
         st.subheader("📈 Cancellation Rate by Market Segment")
         
-        segment_cancel = df.groupby('market_segment')['is_canceled'].agg(['mean', 'count']).reset_index()
-        segment_cancel['mean'] = segment_cancel['mean'] * 100
-        segment_cancel = segment_cancel.sort_values('mean', ascending=False)
-        
-        fig = px.bar(
-            segment_cancel,
-            x='market_segment',
-            y='mean',
-            text='mean',
-            labels={'mean': 'Cancellation Rate (%)', 'market_segment': 'Market Segment'},
-            title="Cancellation Rate by Market Segment",
-            color='mean',
-            color_continuous_scale='RdYlGn_r'
-        )
-        fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-        fig.update_layout(height=500, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        add_chart('segment_cancel_rate', charts.segment_cancel_rate, breakdown='market_segment',
+                  metrics=('cancel_rate',), use_container_width=True)
         
         # Distribution Channel
         st.subheader("🔀 Distribution Channel Performance")
         
-        channel_data = df.groupby(['distribution_channel', 'is_canceled']).size().reset_index(name='count')
-        
-        fig = px.bar(
-            channel_data,
-            x='distribution_channel',
-            y='count',
-            color='is_canceled',
-            barmode='group',
-            labels={'is_canceled': 'Status', 'count': 'Number of Bookings', 'distribution_channel': 'Channel'},
-            color_discrete_map={0: '#2ecc71', 1: '#e74c3c'},
-            title="Bookings by Distribution Channel"
+        add_chart('distribution_channel', charts.distribution_channel, breakdown='distribution_channel',
+                  metrics=('bookings', 'cancel_rate'), use_container_width=True)
+    
+    # Booking Pace Page
+    elif page == "⏳ Booking Pace":
+        st.header("Booking Pace & Pickup")
+        
+        st.markdown("""
+        ### ⏳ How Fast Do Bookings Come In?
+        
+        Each curve shows how many bookings for a year's arrivals were already on the books
+        a given number of days before arrival, and how many of those were cancelled later.
+        Comparing curves across years and hotels shows whether demand is building faster or slower than usual.
+        """)
+        
+        if compare_periods:
+            # Lead time histograms of both periods give their curves without reading bookings
+            current_pace, baseline_pace = period_histograms('lead_time', "All segments")
+            add_chart('period_pace', lambda histogram: charts.period_pace(histogram, baseline_pace), data=current_pace,
+                      use_container_width=True)
+            st.caption("Curves cover whole arrival months: every month the periods overlap.")
+        else:
+            add_chart('booking_pace', charts.booking_pace, use_container_width=True)
+        
+        st.markdown('<div class="insight-box">', unsafe_allow_html=True)
+        st.markdown("""
+        **📖 Reading the Curves:**
+        
+        - **Steeper early rise:** bookings arrive earlier, typical of leisure and group demand
+        - **Gap between the two charts:** bookings that look secure but will still cancel
+        - **Hover a point:** the share of final on-the-books bookings reached at that lead time
+        """)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # Cancellation Drivers Page
+    elif page == "🧭 Cancellation Drivers":
+        st.header("What Drives Cancellations?")
+        
+        st.markdown("""
+        ### 🧭 Every Feature, One Pass
+        
+        Every value of every booking attribute (deposit type, customer type, meal plan, room changes,
+        special requests, parking, lead time and more) is scored against the overall cancellation rate.
+        Values are ranked by **impact**: how many more (or fewer) cancellations they account for than
+        an average booking would.
+        """)
+        
+        if compare_periods:
+            drivers = period_drivers(current_cubes, *dates_to_keys(current_period), hotels=selected_hotels,
+                                     include_outliers=include_outliers)
+            baseline_drivers = period_drivers(baseline_cubes, *dates_to_keys(baseline_period), hotels=selected_hotels,
+                                              include_outliers=include_outliers)
+        else:
+            drivers = driver_analysis(data_version, tuple(selected_hotels), tuple(selected_years), include_outliers)
+            baseline_drivers = None
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Feature Values Scored", f"{len(drivers):,}")
+        with col2:
+            st.metric("Features", drivers['feature'].nunique())
+        with col3:
+            kpi("Overall Cancellation Rate", df['is_canceled'].mean() * 100, "{:.1f}%", "{:+.1f} pp",
+                delta_color="inverse", compared=compared('cancel_rate'))
+        
+        if compare_periods:
+            add_chart('driver_comparison', lambda table: charts.driver_comparison(table, baseline_drivers),
+                      data=drivers, use_container_width=True)
+        else:
+            add_chart('cancellation_drivers', charts.cancellation_drivers, data=drivers, use_container_width=True)
+        
+        st.subheader("📋 Driver Table")
+        feature = st.selectbox("Feature", ["All features"] + sorted(drivers['feature'].unique()))
+        if compare_periods:
+            drivers = driver_comparison(drivers, baseline_drivers)
+        shown = drivers if feature == "All features" else drivers[drivers['feature'] == feature]
+        percent_columns = [column for column in shown.columns if column.startswith(('cancel_rate', 'support'))]
+        st.dataframe(
+            shown.assign(**{column: shown[column] * 100 for column in percent_columns}),
+            column_config={
+                'feature': "Feature",
+                'value': "Value",
+                'bookings': st.column_config.NumberColumn("Bookings", format="%d"),
+                'cancellations': st.column_config.NumberColumn("Cancellations", format="%d"),
+                'support': st.column_config.NumberColumn("Support (%)", format="%.1f"),
+                'cancel_rate': st.column_config.NumberColumn("Cancellation Rate (%)", format="%.1f"),
+                'lift': st.column_config.NumberColumn("Lift", format="%.2f"),
+                'impact': st.column_config.NumberColumn("Impact", format="%+.0f"),
+                'bookings_baseline': st.column_config.NumberColumn("Bookings (Baseline)", format="%d"),
+                'cancellations_baseline': st.column_config.NumberColumn("Cancellations (Baseline)", format="%d"),
+                'support_baseline': st.column_config.NumberColumn("Support (Baseline)", format="%.1f"),
+                'cancel_rate_baseline': st.column_config.NumberColumn("Cancellation Rate (Baseline)", format="%.1f"),
+                'lift_baseline': st.column_config.NumberColumn("Lift (Baseline)", format="%.2f"),
+                'impact_baseline': st.column_config.NumberColumn("Impact (Baseline)", format="%+.0f"),
+                'cancel_rate_delta': st.column_config.NumberColumn("Δ Rate (pp)", format="%+.1f"),
+                'lift_delta': st.column_config.NumberColumn("Δ Lift", format="%+.2f"),
+                'impact_delta': st.column_config.NumberColumn("Δ Impact", format="%+.0f"),
+            },
+            hide_index=True,
+            use_container_width=True
         )
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        
+        st.markdown('<div class="insight-box">', unsafe_allow_html=True)
+        st.markdown("""
+        **📖 Reading the Table:**
+        
+        - **Support:** share of the selected bookings that have this value
+        - **Lift:** the value's cancellation rate divided by the overall rate (above 1 means riskier)
+        - **Impact:** cancellations above (+) or below (-) what the overall rate predicts for these bookings
+        """)
+        st.markdown('</div>', unsafe_allow_html=True)
 
+    # Export the rows or aggregates behind this page for the current selection
+    with st.expander("⬇️ Export Data"):
+        page_columns = DRIVER_COLUMNS if page == "🧭 Cancellation Drivers" else PAGE_COLUMNS[page]
+        export_what = st.radio("Export", ["Rows (columns on this page)", "Rows (all columns)", "Summary by group"],
+                               horizontal=True, key="export_what")
+        group_by = None
+        if export_what == "Summary by group":
+            group_by = st.multiselect(
+                "Group by", EXPORT_GROUPS,
+                default=[column for column in page_columns if column in EXPORT_GROUPS][:2] or ['hotel'],
+                key="export_group_by"
+            )
+        export_format = st.radio("Format", ["CSV", "Parquet"], horizontal=True, key="export_format").lower()
+        
+        if compare_periods:
+            st.caption(f"Exports the current period: {period_label(current_period)}")
+        
+        if st.button("📦 Prepare Export", disabled=export_what == "Summary by group" and not group_by):
+            selection = {
+                'group_by': group_by, 'hotels': selected_hotels, 'years': list(selected_years),
+                'columns': page_columns if export_what == "Rows (columns on this page)" else None,
+                'include_outliers': include_outliers,
+            }
+            if compare_periods:
+                selection['years'] = [current_period[0].year, current_period[1].year]
+                selection['arrival_dates'] = [str(day) for day in current_period]
+            rows = 0 if group_by else count_rows(
+                **{key: selection.get(key) for key in ('hotels', 'years', 'include_outliers', 'arrival_dates')}
+            )
+            if rows > MAX_EXPORT_ROWS:
+                st.warning(f"⚠️ {rows:,} rows is more than the dashboard exports ({MAX_EXPORT_ROWS:,}). "
+                           "Run the export from the Application folder instead; it streams to a file:")
+                st.code(cli_command(export_format, **selection), language='bash')
+            else:
+                # download_button holds the whole payload, which the row cap above keeps bounded
+                with st.spinner("Encoding export..."):
+                    payload = b''.join(export_chunks(export_format, **selection))
+                mime, extension = FORMATS[export_format]
+                st.download_button(
+                    f"⬇️ Download ({len(payload) / 1024:,.0f} KB)",
+                    data=payload,
+                    file_name=f"hotel_bookings_{'summary' if group_by else 'rows'}.{extension}",
+                    mime=mime
+                )
+
+    # Build and draw the charts declared on this page
+    page_charts.render()
+    
     # Footer
     st.markdown("---")
     st.markdown("""
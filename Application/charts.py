@@ -0,0 +1,530 @@
+"""
+Chart builders for the Hotel Booking Analysis Dashboard
+Each builder takes the cleaned bookings DataFrame (or a table derived from it)
+and returns a Plotly figure
+"""
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from anomalies import detect_anomalies
+from dates import MONTH_NAMES, keys_to_dates
+from distributions import bin_edges, ecdf
+from pace import pace_curves
+
+STATUS_COLORS = {0: '#2ecc71', 1: '#e74c3c'}
+STATUS_NAMES = {0: 'Not Cancelled', 1: 'Cancelled'}
+
+
+# Overview
+def status_distribution(df):
+    """Bar chart of cancelled vs not cancelled bookings"""
+    counts = df['is_canceled'].value_counts().sort_index()
+    fig = go.Figure(data=[
+        go.Bar(
+            x=['Not Cancelled', 'Cancelled'],
+            y=counts,
+            marker_color=['#2ecc71', '#e74c3c'],
+            text=counts,
+            textposition='auto',
+        )
+    ])
+    fig.update_layout(
+        title="Booking Status Distribution",
+        xaxis_title="Status",
+        yaxis_title="Number of Bookings",
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def hotel_status(df):
+    """Grouped bar chart of bookings per hotel and status"""
+    hotel_cancel = df.groupby(['hotel', 'is_canceled']).size().reset_index(name='count')
+
+    fig = px.bar(
+        hotel_cancel,
+        x='hotel',
+        y='count',
+        color='is_canceled',
+        barmode='group',
+        labels={'is_canceled': 'Status', 'count': 'Number of Bookings', 'hotel': 'Hotel Type'},
+        color_discrete_map=STATUS_COLORS,
+        title="Bookings by Hotel Type and Status"
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+# Cancellation Analysis
+def monthly_cancellations(df):
+    """Monthly booking counts, cancelled vs not cancelled"""
+    monthly_cancel = df.groupby(['month', 'is_canceled']).size().reset_index(name='count')
+
+    fig = px.line(
+        monthly_cancel,
+        x='month',
+        y='count',
+        color='is_canceled',
+        markers=True,
+        labels={'month': 'Month', 'count': 'Number of Bookings', 'is_canceled': 'Status'},
+        color_discrete_map=STATUS_COLORS,
+        title="Monthly Booking Trends: Cancelled vs Not Cancelled"
+    )
+    fig.update_xaxes(tickmode='linear', dtick=1)
+    fig.update_layout(height=500)
+    return fig
+
+
+def lead_time_means(df):
+    """Average lead time of cancelled vs not cancelled bookings"""
+    cancelled_lead = df[df['is_canceled']==1]['lead_time'].mean()
+    not_cancelled_lead = df[df['is_canceled']==0]['lead_time'].mean()
+
+    fig = go.Figure(data=[
+        go.Bar(
+            x=['Cancelled', 'Not Cancelled'],
+            y=[cancelled_lead, not_cancelled_lead],
+            marker_color=['#e74c3c', '#2ecc71'],
+            text=[f"{cancelled_lead:.0f} days", f"{not_cancelled_lead:.0f} days"],
+            textposition='auto',
+        )
+    ])
+    fig.update_layout(
+        title="Average Lead Time (Days Before Arrival)",
+        yaxis_title="Days",
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def _status_distribution(histogram, metric, title, axis_title):
+    """Histogram (share of bookings per bin) and ECDF per status from a merged histogram"""
+    counts = histogram.to_numpy()
+    totals = counts.sum(axis=1, keepdims=True)
+    shares = counts / (totals + (totals == 0)) * 100
+    cumulative = ecdf(counts) * 100
+
+    # Trim trailing empty bins so the x axis ends at the largest value
+    used = np.flatnonzero(counts.sum(axis=0))
+    stop = used[-1] + 1 if len(used) else 1
+    edges, shares, cumulative = bin_edges(metric)[:stop + 1], shares[:, :stop], cumulative[:, :stop]
+
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("Distribution", "Cumulative Share (ECDF)"))
+    for status, share, cum in zip(histogram.index, shares, cumulative):
+        name, color = STATUS_NAMES[status], STATUS_COLORS[status]
+        fig.add_trace(go.Bar(
+            x=edges[:-1], y=share, width=edges[1] - edges[0], offset=0, name=name,
+            marker_color=color, opacity=0.55, legendgroup=name
+        ), row=1, col=1)
+        fig.add_trace(go.Scatter(
+            x=edges[1:], y=cum, mode='lines', name=name, line=dict(color=color, width=2),
+            legendgroup=name, showlegend=False
+        ), row=1, col=2)
+
+    fig.update_xaxes(title_text=axis_title)
+    fig.update_yaxes(title_text="Share of Bookings (%)", row=1, col=1)
+    fig.update_yaxes(title_text="Bookings at or Below (%)", range=[0, 100], row=1, col=2)
+    fig.update_layout(title=title, barmode='overlay', bargap=0, height=450, hovermode='x unified')
+    return fig
+
+
+def lead_time_distribution(histogram):
+    """Lead time histogram and ECDF, cancelled vs not cancelled"""
+    return _status_distribution(histogram, 'lead_time', "Lead Time Distribution: Cancelled vs Not Cancelled", "Lead Time (Days)")
+
+
+# Revenue Insights
+def daily_mean_adr(df):
+    """Mean ADR per reservation status day, grouped on the integer day key"""
+    daily = df.groupby('status_key')['adr'].mean()
+    return keys_to_dates(daily.index), daily.to_numpy()
+
+
+def _mark_adr_anomalies(fig, df, by, labels=None):
+    """Overlay the days whose mean ADR is anomalous for its series (one series per value of `by`)"""
+    found = detect_anomalies(df, by=[by])
+    found = found[found['metric'] == 'adr']
+    series = found[by].map(labels) if labels else found[by]
+    fig.add_trace(go.Scatter(
+        x=found['date'],
+        y=found['value'],
+        mode='markers',
+        name='ADR Anomaly',
+        marker=dict(symbol='x', size=10, color='#8e44ad', line=dict(width=2)),
+        customdata=np.column_stack([series, found['expected']]) if len(found) else None,
+        hovertemplate='%{customdata[0]}: $%{y:.2f} (expected $%{customdata[1]:.2f})<extra>Anomaly</extra>'
+    ))
+    return fig
+
+
+def adr_by_status(df):
+    """Daily mean ADR (2016-2017) for cancelled vs not cancelled bookings"""
+    in_range = df[(df['year'] >= 2016) & (df['year'] <= 2017)]
+    cancelled_dates, cancelled_adr = daily_mean_adr(in_range[in_range['is_canceled'] == 1])
+    not_cancelled_dates, not_cancelled_adr = daily_mean_adr(in_range[in_range['is_canceled'] == 0])
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=not_cancelled_dates,
+        y=not_cancelled_adr,
+        mode='lines',
+        name='Not Cancelled',
+        line=dict(color='#2ecc71', width=2),
+        fill='tonexty'
+    ))
+    fig.add_trace(go.Scatter(
+        x=cancelled_dates,
+        y=cancelled_adr,
+        mode='lines',
+        name='Cancelled',
+        line=dict(color='#e74c3c', width=2),
+        fill='tonexty'
+    ))
+
+    _mark_adr_anomalies(fig, in_range, 'is_canceled', STATUS_NAMES)
+
+    fig.update_layout(
+        title="Average Daily Rate Over Time (2016-2017): Cancelled vs Not Cancelled",
+        xaxis_title="Date",
+        yaxis_title="Average Daily Rate ($)",
+        height=500,
+        hovermode='x unified'
+    )
+    return fig
+
+
+def adr_by_hotel(df):
+    """Daily mean ADR per hotel type"""
+    resort_dates, resort_adr = daily_mean_adr(df[df['hotel']=='Resort Hotel'])
+    city_dates, city_adr = daily_mean_adr(df[df['hotel']=='City Hotel'])
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=resort_dates,
+        y=resort_adr,
+        mode='lines',
+        name='Resort Hotel',
+        line=dict(color='#3498db', width=2)
+    ))
+    fig.add_trace(go.Scatter(
+        x=city_dates,
+        y=city_adr,
+        mode='lines',
+        name='City Hotel',
+        line=dict(color='#f39c12', width=2)
+    ))
+
+    _mark_adr_anomalies(fig, df, 'hotel')
+
+    fig.update_layout(
+        title="Average Daily Rate by Hotel Type Over Time",
+        xaxis_title="Date",
+        yaxis_title="Average Daily Rate ($)",
+        height=500,
+        hovermode='x unified'
+    )
+    return fig
+
+
+def adr_distribution(histogram):
+    """ADR histogram and ECDF, cancelled vs not cancelled"""
+    return _status_distribution(histogram, 'adr', "ADR Distribution: Cancelled vs Not Cancelled", "Average Daily Rate ($)")
+
+
+# Geographic Analysis
+def top_country_cancellations(df):
+    """Pie chart of the 10 countries with the most cancellations"""
+    top_countries = df[df['is_canceled']==1]['country'].value_counts().head(10)
+
+    fig = go.Figure(data=[go.Pie(
+        labels=top_countries.index,
+        values=top_countries.values,
+        hole=.3,
+        marker_colors=px.colors.qualitative.Set3
+    )])
+    fig.update_layout(
+        title="Distribution of Cancelled Bookings by Country",
+        height=500
+    )
+    return fig
+
+
+def country_cancel_rate(df):
+    """Cancellation rate for the 10 countries with the most bookings"""
+    top_countries_all = df['country'].value_counts().head(10).index
+    country_rate = df[df['country'].isin(top_countries_all)].groupby('country')['is_canceled'].agg(['mean', 'count']).reset_index()
+    country_rate['mean'] = country_rate['mean'] * 100
+    country_rate = country_rate.sort_values('mean', ascending=False)
+
+    fig = px.bar(
+        country_rate,
+        x='country',
+        y='mean',
+        text='mean',
+        labels={'mean': 'Cancellation Rate (%)', 'country': 'Country'},
+        title="Cancellation Rate by Country (Top 10 Booking Countries)",
+        color='mean',
+        color_continuous_scale='Reds'
+    )
+    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+    fig.update_layout(height=500, showlegend=False)
+    return fig
+
+
+# Seasonal Trends
+def monthly_cancelled_adr(df):
+    """Total ADR of cancelled bookings per arrival month"""
+    # Group on the month number so the bars come out in calendar order
+    monthly_adr = df[df['is_canceled']==1].groupby('arrival_month')['adr'].sum().reset_index()
+    monthly_adr['arrival_date_month'] = [MONTH_NAMES[month - 1] for month in monthly_adr['arrival_month']]
+
+    fig = px.bar(
+        monthly_adr,
+        x='arrival_date_month',
+        y='adr',
+        title="Total ADR by Month (Cancelled Bookings Only)",
+        labels={'arrival_date_month': 'Month', 'adr': 'Total ADR ($)'},
+        color='adr',
+        color_continuous_scale='Reds'
+    )
+    fig.update_layout(height=500, xaxis_tickangle=-45)
+    return fig
+
+
+def yearly_bookings(df):
+    """Bookings per year, cancelled vs not cancelled"""
+    yearly = df.groupby(['year', 'is_canceled']).size().reset_index(name='count')
+
+    fig = px.bar(
+        yearly,
+        x='year',
+        y='count',
+        color='is_canceled',
+        barmode='group',
+        labels={'is_canceled': 'Status', 'count': 'Number of Bookings', 'year': 'Year'},
+        color_discrete_map=STATUS_COLORS,
+        title="Annual Booking Trends"
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+# Booking Channels
+def market_segment_all(df):
+    """Market segment share of all bookings"""
+    market_all = df['market_segment'].value_counts()
+
+    fig = go.Figure(data=[go.Pie(
+        labels=market_all.index,
+        values=market_all.values,
+        hole=.3
+    )])
+    fig.update_layout(height=400)
+    return fig
+
+
+def market_segment_cancelled(df):
+    """Market segment share of cancelled bookings"""
+    market_cancelled = df[df['is_canceled']==1]['market_segment'].value_counts()
+
+    fig = go.Figure(data=[go.Pie(
+        labels=market_cancelled.index,
+        values=market_cancelled.values,
+        hole=.3,
+        marker_colors=px.colors.qualitative.Set3
+    )])
+    fig.update_layout(height=400)
+    return fig
+
+
+def segment_cancel_rate(df):
+    """Cancellation rate per market segment"""
+    segment_cancel = df.groupby('market_segment')['is_canceled'].agg(['mean', 'count']).reset_index()
+    segment_cancel['mean'] = segment_cancel['mean'] * 100
+    segment_cancel = segment_cancel.sort_values('mean', ascending=False)
+
+    fig = px.bar(
+        segment_cancel,
+        x='market_segment',
+        y='mean',
+        text='mean',
+        labels={'mean': 'Cancellation Rate (%)', 'market_segment': 'Market Segment'},
+        title="Cancellation Rate by Market Segment",
+        color='mean',
+        color_continuous_scale='RdYlGn_r'
+    )
+    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+    fig.update_layout(height=500, showlegend=False)
+    return fig
+
+
+def distribution_channel(df):
+    """Bookings per distribution channel and status"""
+    channel_data = df.groupby(['distribution_channel', 'is_canceled']).size().reset_index(name='count')
+
+    fig = px.bar(
+        channel_data,
+        x='distribution_channel',
+        y='count',
+        color='is_canceled',
+        barmode='group',
+        labels={'is_canceled': 'Status', 'count': 'Number of Bookings', 'distribution_channel': 'Channel'},
+        color_discrete_map=STATUS_COLORS,
+        title="Bookings by Distribution Channel"
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+# Booking Pace
+def booking_pace(df):
+    """Pace curves per hotel and arrival year: on the books and later cancelled"""
+    curves = pace_curves(df)
+    curves['series'] = curves['group'] + ' ' + curves['year'].astype(str)
+
+    fig = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+        subplot_titles=("Bookings on the Books", "Of Which Later Cancelled")
+    )
+    colors = px.colors.qualitative.Plotly
+    for i, (series, curve) in enumerate(curves.groupby('series', sort=True)):
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Scatter(
+            x=curve['days_before'], y=curve['on_books'], mode='lines', name=series,
+            line=dict(color=color, width=2), legendgroup=series,
+            customdata=curve['pct_of_final'],
+            hovertemplate='%{y:,} bookings (%{customdata:.0f}% of final)<extra>' + series + '</extra>'
+        ), row=1, col=1)
+        fig.add_trace(go.Scatter(
+            x=curve['days_before'], y=curve['later_cancelled'], mode='lines', name=series,
+            line=dict(color=color, width=2, dash='dot'), legendgroup=series, showlegend=False
+        ), row=2, col=1)
+
+    fig.update_xaxes(autorange='reversed')
+    fig.update_xaxes(title_text="Days Before Arrival", row=2, col=1)
+    fig.update_yaxes(title_text="Bookings", row=1, col=1)
+    fig.update_yaxes(title_text="Bookings", row=2, col=1)
+    fig.update_layout(
+        title="Booking Pace by Hotel and Arrival Year",
+        height=750,
+        hovermode='x unified'
+    )
+    return fig
+
+
+# Drivers
+def cancellation_drivers(table, top=20):
+    """Feature values with the largest excess or avoided cancellations, from a driver table"""
+    top_values = table.head(top).iloc[::-1]
+    labels = top_values['feature'] + ' = ' + top_values['value']
+
+    fig = go.Figure(data=[
+        go.Bar(
+            x=top_values['impact'],
+            y=labels,
+            orientation='h',
+            marker=dict(color=top_values['lift'], colorscale='RdYlGn_r', cmid=1,
+                        colorbar=dict(title='Lift')),
+            customdata=top_values[['cancel_rate', 'support', 'bookings']].to_numpy() * [100, 100, 1],
+            hovertemplate=('%{y}<br>Cancellation rate: %{customdata[0]:.1f}%'
+                           '<br>Support: %{customdata[1]:.1f}% (%{customdata[2]:,.0f} bookings)'
+                           '<br>Excess cancellations: %{x:,.0f}<extra></extra>'),
+        )
+    ])
+    fig.update_layout(
+        title=f"Top {len(top_values)} Cancellation Drivers by Impact",
+        xaxis_title="Cancellations Above (+) or Below (-) the Overall Rate",
+        height=max(400, 28 * len(top_values) + 150),
+        showlegend=False
+    )
+    return fig
+
+
+# Period Comparison
+METRIC_TITLES = {
+    'bookings': "Bookings",
+    'cancellations': "Cancellations",
+    'cancel_rate': "Cancellation Rate (%)",
+    'adr': "Average Daily Rate ($)",
+    'lead_time': "Average Lead Time (days)",
+}
+
+
+def period_comparison(table, metrics=('cancel_rate', 'adr'), top=15):
+    """Metrics of two periods side by side per breakdown value, from a periods.compare table"""
+    shown = table.head(top)
+    names = shown.index.map(STATUS_NAMES) if shown.index.name == 'is_canceled' else shown.index.astype(str)
+    fig = make_subplots(rows=1, cols=len(metrics), subplot_titles=[METRIC_TITLES[metric] for metric in metrics])
+    for period, color in (('baseline', '#95a5a6'), ('current', '#3498db')):
+        for col, metric in enumerate(metrics, start=1):
+            fig.add_trace(
+                go.Bar(
+                    x=names, y=shown[(metric, period)],
+                    name=period.title(), marker_color=color, showlegend=col == 1,
+                    customdata=shown[('bookings', period)],
+                    hovertemplate='%{x}: %{y:,.1f}<br>Bookings: %{customdata:,.0f}<extra></extra>',
+                ),
+                row=1, col=col
+            )
+    breakdown = 'Booking Status' if table.index.name == 'is_canceled' else table.index.name.replace('_', ' ').title()
+    fig.update_layout(title=f"Current vs Baseline by {breakdown}", barmode='group', height=450)
+    return fig
+
+
+def period_pace(current, baseline):
+    """
+    Pace curves of two periods from their lead time histograms (merged by is_canceled)
+
+    Bookings on the books d days before arrival are those with a lead time of
+    at least d, so each curve is a reverse cumulative sum of the histogram.
+    """
+    days_before = bin_edges('lead_time')[:-1]
+    fig = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+        subplot_titles=("Bookings on the Books", "Of Which Later Cancelled")
+    )
+    for period, histogram, color in (('Baseline', baseline, '#95a5a6'), ('Current', current, '#3498db')):
+        on_books = histogram.sum(axis=0).to_numpy()[::-1].cumsum()[::-1]
+        cancelled = histogram.reindex([1], fill_value=0).iloc[0].to_numpy()[::-1].cumsum()[::-1]
+        final = on_books[0] if len(on_books) and on_books[0] else np.nan
+        fig.add_trace(go.Scatter(
+            x=days_before, y=on_books, mode='lines', name=period, line=dict(color=color, width=2),
+            legendgroup=period, customdata=on_books / final * 100,
+            hovertemplate='%{y:,} bookings (%{customdata:.0f}% of final)<extra>' + period + '</extra>'
+        ), row=1, col=1)
+        fig.add_trace(go.Scatter(
+            x=days_before, y=cancelled, mode='lines', name=period,
+            line=dict(color=color, width=2, dash='dot'), legendgroup=period, showlegend=False
+        ), row=2, col=1)
+
+    fig.update_xaxes(autorange='reversed')
+    fig.update_xaxes(title_text="Days Before Arrival", row=2, col=1)
+    fig.update_yaxes(title_text="Bookings", row=1, col=1)
+    fig.update_yaxes(title_text="Bookings", row=2, col=1)
+    fig.update_layout(title="Booking Pace: Current vs Baseline", height=750, hovermode='x unified')
+    return fig
+
+
+def driver_comparison(current, baseline, top=20):
+    """Impact of the current period's top drivers next to their impact in the baseline"""
+    table = current.head(top).merge(baseline[['feature', 'value', 'impact']], on=['feature', 'value'],
+                                    how='left', suffixes=('', '_baseline')).iloc[::-1]
+    labels = table['feature'] + ' = ' + table['value']
+    fig = go.Figure(data=[
+        go.Bar(x=table['impact_baseline'], y=labels, orientation='h', name='Baseline', marker_color='#95a5a6',
+               hovertemplate='%{y}<br>Excess cancellations: %{x:,.0f}<extra>Baseline</extra>'),
+        go.Bar(x=table['impact'], y=labels, orientation='h', name='Current', marker_color='#3498db',
+               hovertemplate='%{y}<br>Excess cancellations: %{x:,.0f}<extra>Current</extra>'),
+    ])
+    fig.update_layout(
+        title=f"Top {len(table)} Cancellation Drivers: Current vs Baseline",
+        xaxis_title="Cancellations Above (+) or Below (-) the Overall Rate",
+        barmode='group',
+        height=max(400, 36 * len(table) + 150)
+    )
+    return fig
@@ -0,0 +1,110 @@
+"""
+Partitioned columnar store for the hotel booking data
+Cleaned bookings are written as Hive-style Parquet partitions
+(hotel=<name>/arrival_date_year=<year>/) so queries for one property or
+season only read the matching directories
+"""
+
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from dates import dates_to_keys
+
+STORE_DIR = 'hotel_booking_store'
+PARTITION_COLS = ['hotel', 'arrival_date_year']
+VERSION_FILE = '_version'
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('hotel', pa.string()), ('arrival_date_year', pa.int64())]),
+    flavor='hive'
+)
+
+
+def store_version(root=STORE_DIR):
+    """Dataset version the store was built from, or None if there is no store"""
+    try:
+        with open(os.path.join(root, VERSION_FILE)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def build_store(df, version, root=STORE_DIR):
+    """Write df as a partitioned Parquet dataset, replacing any previous store"""
+    tmp_root = f"{root}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_root, ignore_errors=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_to_dataset(table, tmp_root, partition_cols=PARTITION_COLS)
+    # An empty frame writes no partitions, so the directory may not exist yet
+    os.makedirs(tmp_root, exist_ok=True)
+    with open(os.path.join(tmp_root, VERSION_FILE), 'w') as f:
+        f.write(version)
+
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(tmp_root, root)
+    return root
+
+
+def ensure_store(source, root=STORE_DIR):
+    """Build the store from the pipeline's enriched stage unless it is already current"""
+    import pipeline
+    key = pipeline.stage_key('enriched', source)
+    if store_version(root) != key:
+        build_store(pipeline.run('enriched', source), key, root)
+    return root
+
+
+def partitions(root=STORE_DIR):
+    """List the (hotel, arrival year) partitions present in the store"""
+    dataset = ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+    keys = set()
+    for fragment in dataset.get_fragments():
+        expr = ds.get_partition_keys(fragment.partition_expression)
+        keys.add((expr['hotel'], expr['arrival_date_year']))
+    return sorted(keys)
+
+
+def partition_filter(hotels=None, years=None):
+    """Build a pyarrow filter on the partition columns; None means no restriction"""
+    expr = None
+    if hotels is not None:
+        # Typed value set, so an empty selection still filters a string column
+        expr = ds.field('hotel').isin(pa.array(list(hotels), type=pa.string()))
+    if years is not None:
+        year_expr = (ds.field('arrival_date_year') >= years[0]) & (ds.field('arrival_date_year') <= years[1])
+        expr = year_expr if expr is None else expr & year_expr
+    return expr
+
+
+def row_filter(hotels=None, years=None, include_outliers=True, arrival_dates=None):
+    """
+    Partition filter, plus excluding rows flagged as outliers unless include_outliers
+
+    arrival_dates (first, last) keeps arrivals in that inclusive date range.
+    """
+    expr = partition_filter(hotels, years)
+    if not include_outliers:
+        expr = ~ds.field('is_outlier') if expr is None else expr & ~ds.field('is_outlier')
+    if arrival_dates is not None:
+        first, last = dates_to_keys(arrival_dates).tolist()
+        date_expr = (ds.field('arrival_key') >= first) & (ds.field('arrival_key') <= last)
+        expr = date_expr if expr is None else expr & date_expr
+    return expr
+
+
+def load_store(root=STORE_DIR, hotels=None, years=None, columns=None, include_outliers=True):
+    """
+    Read bookings for the selected hotels and inclusive arrival year range
+
+    Only partitions matching the filters are opened. Rows flagged as outliers
+    are skipped unless include_outliers is set.
+    """
+    dataset = ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+    table = dataset.to_table(columns=columns, filter=row_filter(hotels, years, include_outliers))
+    return table.to_pandas()
+
@@ -0,0 +1,125 @@
+"""
+Date handling for the hotel booking data
+Dates are stored as integer day keys (days since 1970-01-01) and described by
+a precomputed date dimension table, so time-based grouping works on small
+integers instead of strings or timestamps
+"""
+
+import numpy as np
+import pandas as pd
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+# Format of reservation_status_date in the dataset, e.g. 1/7/2015 (day first, not zero-padded)
+RESERVATION_DATE_FORMAT = '%d/%m/%Y'
+
+SEASONS = np.array(['Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer',
+                    'Summer', 'Summer', 'Autumn', 'Autumn', 'Autumn', 'Winter'])
+
+# Portuguese national holidays (both hotels are in Portugal) as (month, day)
+FIXED_HOLIDAYS = [(1, 1), (4, 25), (5, 1), (6, 10), (8, 15), (10, 5),
+                  (11, 1), (12, 1), (12, 8), (12, 25)]
+# Movable holidays as offsets from Easter Sunday: Good Friday, Easter, Corpus Christi
+EASTER_OFFSETS = [-2, 0, 60]
+
+
+def parse_day_keys(values, fmt=RESERVATION_DATE_FORMAT):
+    """
+    Parse date strings into integer day keys
+
+    Each distinct string is parsed once with an explicit format; strings that do
+    not match it fall back to ISO 8601, then to day-first inference.
+    Unparseable dates become -1.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques)
+    parsed = pd.to_datetime(uniques, format=fmt, errors='coerce')
+    for fallback in ({'format': 'ISO8601'}, {'dayfirst': True}):
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(uniques[missing], errors='coerce', **fallback)
+    unique_keys = np.where(parsed.isna(), -1, parsed.to_numpy().astype('datetime64[D]').astype(np.int64))
+    keys = unique_keys[codes]
+    keys[codes < 0] = -1
+    return keys.astype(np.int32)
+
+
+def month_numbers(month_names):
+    """Map full month names to 1-12 (0 for unknown names)"""
+    codes, uniques = pd.factorize(month_names)
+    lookup = np.array([MONTH_NAMES.index(name) + 1 if name in MONTH_NAMES else 0 for name in uniques], dtype=np.int8)
+    return lookup[codes] if len(lookup) else np.zeros(len(codes), dtype=np.int8)
+
+
+def day_keys_from_parts(year, month, day):
+    """Build day keys from year, month number and day-of-month arrays"""
+    months = (np.asarray(year, dtype=np.int64) - 1970) * 12 + np.asarray(month, dtype=np.int64) - 1
+    first_of_month = months.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+    return (first_of_month + np.asarray(day, dtype=np.int64) - 1).astype(np.int32)
+
+
+def keys_to_dates(keys):
+    """Convert day keys back to datetime64 values"""
+    return np.asarray(keys, dtype=np.int64).astype('datetime64[D]').astype('datetime64[ns]')
+
+
+def months_between(start_key, end_key):
+    """(year, month) of every calendar month overlapping the day keys start_key..end_key"""
+    first, last = np.asarray([start_key, end_key], dtype='datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    months = np.arange(first, last + 1)
+    return list(zip((months // 12 + 1970).tolist(), (months % 12 + 1).tolist()))
+
+
+def dates_to_keys(dates):
+    """Convert dates (datetime.date, datetime64 or Timestamp values) to day keys"""
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+
+def easter_sundays(years):
+    """Gregorian Easter Sunday (anonymous algorithm) for each year, as day keys"""
+    y = np.asarray(years, dtype=np.int64)
+    a = y % 19
+    b, c = y // 100, y % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return day_keys_from_parts(y, month, day)
+
+
+def build_date_dimension(first_key, last_key):
+    """
+    Date dimension covering day keys first_key..last_key, indexed by day key
+
+    Columns: date, year, month, month_name, iso_week, weekday (Monday=0),
+    is_weekend, season, is_holiday, near_holiday (holiday within one day).
+    """
+    keys = np.arange(first_key, last_key + 1, dtype=np.int32)
+    dates = pd.DatetimeIndex(keys_to_dates(keys))
+    dim = pd.DataFrame({
+        'date': dates,
+        'year': dates.year.astype(np.int16),
+        'month': dates.month.astype(np.int8),
+        'iso_week': dates.isocalendar().week.to_numpy().astype(np.int8),
+        'weekday': dates.weekday.astype(np.int8),
+    }, index=pd.Index(keys, name='day_key'))
+    dim['month_name'] = pd.Categorical.from_codes(dim['month'] - 1, categories=MONTH_NAMES, ordered=True)
+    dim['is_weekend'] = dim['weekday'] >= 5
+    dim['season'] = pd.Categorical(SEASONS[dim['month'] - 1], categories=['Winter', 'Spring', 'Summer', 'Autumn'])
+
+    years = np.unique(dim['year'])
+    holidays = [day_keys_from_parts(years, np.full(len(years), month), np.full(len(years), day))
+                for month, day in FIXED_HOLIDAYS]
+    easter = easter_sundays(years)
+    holidays += [easter + offset for offset in EASTER_OFFSETS]
+    holidays = np.concatenate(holidays)
+    dim['is_holiday'] = np.isin(keys, holidays)
+    dim['near_holiday'] = np.isin(keys, np.concatenate([holidays - 1, holidays, holidays + 1]))
+    return dim
@@ -0,0 +1,100 @@
+"""
+Distribution engine for lead time and ADR
+Values are pre-bucketed into fixed-width integer bins and counted per hotel x
+arrival year x arrival month x market segment x cancellation status x outlier
+flag with one bincount. Histograms of any slice (including a range of arrival
+months) are merged by summing rows, so filters, period comparisons,
+percentiles and ECDFs never rescan bookings
+"""
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['hotel', 'arrival_date_year', 'arrival_month', 'market_segment', 'is_canceled', 'is_outlier']
+
+# metric -> (first bin start, bin width, number of bins); the first and last
+# bins also collect values below and above the range
+METRICS = {
+    'lead_time': (0, 1, 731),
+    'adr': (0, 2, 300),
+}
+
+
+def bin_edges(metric):
+    """Bin edges of a metric's histogram"""
+    start, width, n_bins = METRICS[metric]
+    return start + width * np.arange(n_bins + 1, dtype=np.float64)
+
+
+def bin_codes(values, metric):
+    """Integer bin code of each value"""
+    start, width, n_bins = METRICS[metric]
+    codes = np.floor((np.asarray(values, dtype=np.float64) - start) / width)
+    return np.clip(np.nan_to_num(codes), 0, n_bins - 1).astype(np.int64)
+
+
+def build_histograms(df, dimensions=DIMENSIONS):
+    """
+    Histograms of every metric per dimension combination
+
+    Returns {metric: DataFrame} indexed by the dimensions, one column per bin
+    (labelled by the bin start), holding booking counts (int32, as one row
+    per arrival month multiplies the rows).
+    """
+    grouped = df.groupby(dimensions, sort=True, observed=True)
+    groups = grouped.ngroup().to_numpy(dtype=np.int64)
+    index = grouped.size().index
+
+    histograms = {}
+    for metric, (_, _, n_bins) in METRICS.items():
+        counts = np.bincount(groups * n_bins + bin_codes(df[metric], metric), minlength=len(index) * n_bins)
+        histograms[metric] = pd.DataFrame(
+            counts.reshape(len(index), n_bins).astype(np.int32), index=index, columns=bin_edges(metric)[:-1]
+        )
+    return histograms
+
+
+def merge(histogram, by='is_canceled', months=None, **selection):
+    """
+    Sum the histograms of the selected slices, one row per value of `by`
+
+    selection maps dimension names to the values to keep, e.g.
+    merge(hist, hotel=['City Hotel'], arrival_date_year=[2016, 2017]);
+    None keeps every value. months keeps only the given (arrival year,
+    arrival month) pairs, e.g. from dates.months_between.
+    """
+    mask = np.ones(len(histogram), dtype=bool)
+    if months is not None:
+        index = histogram.index
+        arrivals = pd.MultiIndex.from_arrays([index.get_level_values('arrival_date_year'),
+                                              index.get_level_values('arrival_month')])
+        mask &= arrivals.isin(list(months))
+    for level, values in selection.items():
+        if values is not None:
+            mask &= histogram.index.get_level_values(level).isin(list(values))
+    return histogram[mask].groupby(level=by).sum()
+
+
+def ecdf(counts):
+    """Cumulative share of bookings at each bin's upper edge, per row"""
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=-1, keepdims=True)
+    return np.divide(counts.cumsum(axis=-1), totals, out=np.zeros_like(counts), where=totals > 0)
+
+
+def percentiles(histogram, metric, q=(10, 25, 50, 75, 90)):
+    """Percentiles per row of a merged histogram, interpolated linearly within bins"""
+    edges = bin_edges(metric)
+    counts = histogram.to_numpy(dtype=np.float64)
+    cumulative = counts.cumsum(axis=1)
+    result = np.full((len(counts), len(q)), np.nan)
+    for row, (row_counts, row_cumulative) in enumerate(zip(counts, cumulative)):
+        total = row_cumulative[-1]
+        if total == 0:
+            continue
+        targets = np.asarray(q, dtype=np.float64) / 100 * total
+        bins = np.minimum(np.searchsorted(row_cumulative, targets, side='left'), len(row_counts) - 1)
+        below = row_cumulative[bins] - row_counts[bins]
+        within = np.divide(targets - below, row_counts[bins], out=np.zeros(len(q)), where=row_counts[bins] > 0)
+        result[row] = edges[bins] + within * (edges[bins + 1] - edges[bins])
+    return pd.DataFrame(result, index=histogram.index, columns=[f"p{p}" for p in q])
@@ -0,0 +1,121 @@
+"""
+Cancellation driver analysis
+Scores every value of every categorical (or bucketed numeric) feature by
+cancellation rate, lift and support in one pass: the features are one-hot
+encoded as stacked integer codes and the cancellation vector is multiplied
+against that sparse matrix with a single weighted bincount
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_FEATURES = [
+    'hotel', 'meal', 'country', 'market_segment', 'distribution_channel',
+    'deposit_type', 'customer_type', 'reserved_room_type', 'assigned_room_type',
+    'is_repeated_guest',
+]
+
+# Numeric features as (column, bin edges, labels); bins are left-closed
+NUMERIC_BUCKETS = [
+    ('lead_time', [0, 7, 30, 90, 180, 365, np.inf],
+     ['0-6 days', '7-29 days', '30-89 days', '90-179 days', '180-364 days', '365+ days']),
+    ('total_of_special_requests', [0, 1, 2, 3, np.inf], ['0', '1', '2', '3+']),
+    ('required_car_parking_spaces', [0, 1, np.inf], ['0', '1+']),
+    ('previous_cancellations', [0, 1, 2, np.inf], ['0', '1', '2+']),
+    ('booking_changes', [0, 1, 2, np.inf], ['0', '1', '2+']),
+    ('days_in_waiting_list', [0, 1, 30, np.inf], ['0', '1-29', '30+']),
+    ('adr', [-np.inf, 50, 100, 150, 200, np.inf], ['< 50', '50-99', '100-149', '150-199', '200+']),
+]
+
+# Columns the analysis reads (room_changed is derived from the two room types)
+DRIVER_COLUMNS = ['is_canceled'] + CATEGORICAL_FEATURES + [column for column, _, _ in NUMERIC_BUCKETS]
+
+CHUNK_ROWS = 1 << 20
+
+
+def _bucket(values, edges, labels):
+    """Bucket codes for a numeric column; missing values get code -1"""
+    codes = np.searchsorted(edges, values, side='right') - 1
+    codes = np.clip(codes, 0, len(labels) - 1)
+    codes[np.isnan(values)] = -1
+    return codes, labels
+
+
+def feature_codes(df):
+    """Integer codes and value labels for every driver feature present in df"""
+    features = []
+    for column in CATEGORICAL_FEATURES:
+        if column in df:
+            codes, uniques = pd.factorize(df[column], sort=True)
+            features.append((column, codes, [str(value) for value in uniques]))
+    for column, edges, labels in NUMERIC_BUCKETS:
+        if column in df:
+            values = df[column].to_numpy(dtype=np.float64)
+            codes, labels = _bucket(values, np.asarray(edges, dtype=np.float64), labels)
+            features.append((column, codes, labels))
+    if 'reserved_room_type' in df and 'assigned_room_type' in df:
+        changed = (df['reserved_room_type'] != df['assigned_room_type']).to_numpy()
+        features.append(('room_changed', changed.astype(np.int64), ['No', 'Yes']))
+    return features
+
+
+def driver_counts(df, cells=None, n_cells=1):
+    """
+    Bookings and cancellations per cell x feature value
+
+    cells assigns each row to one of n_cells cells (all rows share one cell by
+    default). Returns (labels, counts): labels is a DataFrame of feature and
+    value per one-hot column and counts an array of shape (n_cells, columns
+    + 1, 2) holding bookings and cancellations; the extra last column collects
+    missing values.
+    """
+    features = feature_codes(df)
+    cancelled = df['is_canceled'].to_numpy() == 1
+    n = len(cancelled)
+    cells = np.zeros(n, dtype=np.int64) if cells is None else np.asarray(cells, dtype=np.int64)
+
+    # Offset each feature's codes into one shared column space of the one-hot matrix
+    sizes = [len(labels) for _, _, labels in features]
+    offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+    width = int(offsets[-1]) + 1  # last slot collects missing values
+
+    bookings = np.zeros(n_cells * width, dtype=np.int64)
+    cancellations = np.zeros(n_cells * width, dtype=np.int64)
+    for start in range(0, n, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, n)
+        cols = np.stack([codes[start:stop] for _, codes, _ in features], axis=1).astype(np.int64)
+        cols = np.where(cols < 0, width - 1, cols + offsets[:-1]) + cells[start:stop, None] * width
+        # X.T @ 1 and X.T @ is_canceled for this chunk's rows of the one-hot matrix X
+        bookings += np.bincount(cols.ravel(), minlength=n_cells * width)
+        cancellations += np.bincount(cols[cancelled[start:stop]].ravel(), minlength=n_cells * width)
+
+    labels = pd.DataFrame({
+        'feature': np.repeat([name for name, _, _ in features], sizes),
+        'value': [label for _, _, labels in features for label in labels],
+    })
+    return labels, np.stack([bookings, cancellations], axis=-1).reshape(n_cells, width, 2)
+
+
+def score(labels, bookings, cancellations, n, n_cancelled, min_support=0.005):
+    """Rank feature values by impact from their booking and cancellation counts"""
+    table = labels.assign(bookings=bookings, cancellations=cancellations)
+    overall = n_cancelled / n if n else 0.0
+    table['support'] = table['bookings'] / max(n, 1)
+    table['cancel_rate'] = table['cancellations'] / table['bookings'].where(table['bookings'] > 0)
+    table['lift'] = table['cancel_rate'] / overall if overall else np.nan
+    table['impact'] = table['cancellations'] - table['bookings'] * overall
+    table = table[table['support'] >= min_support]
+    return table.reindex(table['impact'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+
+def driver_table(df, min_support=0.005):
+    """
+    Cancellation rate, lift and support for every feature value, ranked by impact
+
+    support is the share of bookings with the value, lift its cancellation rate
+    over the overall rate, and impact the excess (or avoided) cancellations
+    relative to the overall rate.
+    """
+    labels, counts = driver_counts(df)
+    cancelled = df['is_canceled'].to_numpy() == 1
+    return score(labels, counts[0, :-1, 0], counts[0, :-1, 1], len(cancelled), cancelled.sum(), min_support)
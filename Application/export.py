@@ -0,0 +1,214 @@
+"""
+Streaming export of filtered bookings and aggregates
+Rows are scanned from the partitioned store in record batches and encoded one
+batch at a time, so exports of millions of rows run in bounded memory.
+
+Usage:
+    python export.py --hotel "City Hotel" --years 2016 2017 --format parquet --output city.parquet
+    python export.py --group-by hotel market_segment --output segments.csv
+    python export.py --arrival-dates 2017-01-01 2017-03-31 --output q1.csv
+"""
+
+import argparse
+import io
+import shlex
+import sys
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from data_store import PARTITIONING, STORE_DIR, ensure_store, row_filter
+
+BATCH_ROWS = 64 * 1024
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def scan_batches(root=STORE_DIR, hotels=None, years=None, columns=None, include_outliers=True,
+                 arrival_dates=None, batch_rows=BATCH_ROWS):
+    """Schema and lazily read record batches of the selected bookings"""
+    dataset = ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+    expr = row_filter(hotels, years, include_outliers, arrival_dates)
+    schema = dataset.schema if columns is None else pa.schema([dataset.schema.field(column) for column in columns])
+
+    def batches():
+        # One row group at a time on the calling thread: the dataset scanner
+        # buffers whole files ahead of a slow consumer
+        for fragment in dataset.get_fragments(filter=expr):
+            for row_group in fragment.split_by_row_group():
+                yield from row_group.to_batches(
+                    schema=dataset.schema, columns=schema.names, filter=expr,
+                    batch_size=batch_rows, use_threads=False
+                )
+    return schema, batches()
+
+
+def count_rows(root=STORE_DIR, hotels=None, years=None, include_outliers=True, arrival_dates=None):
+    """Number of bookings in the selection, answered from Parquet metadata where the filter allows"""
+    dataset = ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+    return dataset.count_rows(filter=row_filter(hotels, years, include_outliers, arrival_dates))
+
+
+def cli_command(fmt='csv', group_by=None, hotels=None, years=None, columns=None, include_outliers=True,
+                arrival_dates=None, output=None):
+    """Command line of this script that exports the same selection to a file"""
+    args = ['python', 'export.py']
+    for hotel in hotels or []:
+        args += ['--hotel', hotel]
+    if years is not None:
+        args += ['--years', *map(str, years)]
+    if arrival_dates is not None:
+        args += ['--arrival-dates', *map(str, arrival_dates)]
+    if columns:
+        args += ['--columns', *columns]
+    if group_by:
+        args += ['--group-by', *group_by]
+    if include_outliers:
+        args.append('--include-outliers')
+    args += ['--format', fmt, '--output', output or f"hotel_bookings.{FORMATS[fmt][1]}"]
+    return shlex.join(args)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last take()"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def csv_chunks(schema, batches):
+    """Encode batches as CSV, yielding one bytes chunk per batch"""
+    sink = _ChunkSink()
+    with pv.CSVWriter(sink, schema) as writer:
+        yield sink.take()
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
+
+
+def parquet_chunks(schema, batches):
+    """Encode batches as a Parquet file (one row group per batch), yielding bytes chunks"""
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
+
+
+def aggregate_batches(schema, batches, keys):
+    """
+    Bookings, cancellations, cancellation rate and mean ADR per group of keys
+
+    Each batch is reduced to partial sums and the partials are merged every
+    few dozen batches, so memory is bounded by the number of groups.
+    """
+    partials = []
+    for batch in batches:
+        partials.append(
+            pa.Table.from_batches([batch])
+            .group_by(keys)
+            .aggregate([('is_canceled', 'count'), ('is_canceled', 'sum'), ('adr', 'sum')])
+        )
+        if len(partials) > 64:
+            partials = [_combine(partials, keys)]
+    if not partials:
+        partials = [pa.table({
+            **{key: pa.array([], schema.field(key).type) for key in keys},
+            **{name: pa.array([], pa.int64()) for name in ('is_canceled_count', 'is_canceled_sum')},
+            'adr_sum': pa.array([], pa.float64()),
+        })]
+    totals = _combine(partials, keys).sort_by([(key, 'ascending') for key in keys])
+
+    bookings = totals['is_canceled_count']
+    return pa.table({
+        **{key: totals[key] for key in keys},
+        'bookings': bookings,
+        'cancellations': totals['is_canceled_sum'],
+        'cancel_rate': pc.divide(pc.cast(totals['is_canceled_sum'], pa.float64()), bookings),
+        'adr_mean': pc.divide(totals['adr_sum'], pc.cast(bookings, pa.float64())),
+    })
+
+
+def _combine(partials, keys):
+    """Merge partial aggregates by summing them per group"""
+    measures = ['is_canceled_count', 'is_canceled_sum', 'adr_sum']
+    totals = pa.concat_tables(partials).group_by(keys).aggregate([(name, 'sum') for name in measures])
+    renamed = {f"{name}_sum": name for name in measures}
+    return totals.rename_columns([renamed.get(name, name) for name in totals.column_names])
+
+
+def export_chunks(fmt='csv', group_by=None, **selection):
+    """
+    Bytes chunks of the selected bookings (or their aggregates by group_by) in fmt
+
+    selection is passed to scan_batches: root, hotels, years, columns,
+    include_outliers, arrival_dates, batch_rows.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    encode = csv_chunks if fmt == 'csv' else parquet_chunks
+    if group_by:
+        selection['columns'] = list(dict.fromkeys([*group_by, 'is_canceled', 'adr']))
+        schema, batches = scan_batches(**selection)
+        table = aggregate_batches(schema, batches, list(group_by))
+        return encode(table.schema, table.to_batches(max_chunksize=BATCH_ROWS))
+    return encode(*scan_batches(**selection))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export filtered bookings or aggregates from the dashboard's store")
+    parser.add_argument('--source', default='hotel_booking.csv', help="CSV the store is built from")
+    parser.add_argument('--store', default=STORE_DIR, help="partitioned store directory")
+    parser.add_argument('--hotel', action='append', dest='hotels', help="hotel to include (repeatable; default all)")
+    parser.add_argument('--years', type=int, nargs=2, metavar=('FIRST', 'LAST'), help="inclusive arrival year range")
+    parser.add_argument('--arrival-dates', nargs=2, metavar=('FIRST', 'LAST'),
+                        help="inclusive arrival date range (YYYY-MM-DD)")
+    parser.add_argument('--columns', nargs='+', help="columns to export (default all)")
+    parser.add_argument('--group-by', nargs='+', help="export aggregates per group of these columns instead of rows")
+    parser.add_argument('--include-outliers', action='store_true', help="keep rows flagged as ADR outliers")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+    parser.add_argument('--output', default='-', help="output file ('-' for stdout)")
+    args = parser.parse_args()
+
+    ensure_store(args.source, args.store)
+    chunks = export_chunks(
+        args.format, group_by=args.group_by, root=args.store, hotels=args.hotels,
+        years=args.years, columns=args.columns, include_outliers=args.include_outliers,
+        arrival_dates=args.arrival_dates
+    )
+    out = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        written = 0
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    if args.output != '-':
+        print(f"✅ Exported {written:,} bytes to {args.output}")
@@ -0,0 +1,90 @@
+"""
+Figure cache for the Hotel Booking Analysis Dashboard
+Keeps prebuilt Plotly figures keyed by (dataset version, page, chart id, filter state)
+so a rerun with unchanged data and selections skips aggregation and figure construction
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+
+def dataset_version(path):
+    """Fingerprint of the data file that changes whenever the file is rewritten"""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def filter_key(filters):
+    """Stable string form of the current filter selections"""
+    return json.dumps(filters or {}, sort_keys=True, default=str)
+
+
+# Streamlit re-validates dict specs passed to st.plotly_chart, so the validated
+# go.Figure is kept instead; plotly_chart serializes it without re-validating.
+@st.cache_resource(max_entries=512, show_spinner=False)
+def _cached_figure(version, page, chart_id, filters_key, _build, _df):
+    return _build(_df)
+
+
+def get_figure(page, chart_id, build, df, version, filters=None):
+    """Return the figure for a chart, building it only on a cache miss"""
+    return _cached_figure(version, page, chart_id, filter_key(filters), build, df)
+
+
+def plotly_chart(page, chart_id, build, df, version, filters=None, **kwargs):
+    """Cached drop-in for st.plotly_chart(build(df), **kwargs)"""
+    st.plotly_chart(get_figure(page, chart_id, build, df, version, filters), **kwargs)
+
+
+class ChartBatch:
+    """
+    Collects the charts of one page as independent tasks
+
+    In concurrent mode each chart gets a placeholder where it is declared and the
+    figures are built on a thread pool by render(); each chart is drawn as soon as
+    its figure is ready. Otherwise charts are drawn immediately, in order.
+    """
+
+    def __init__(self, page, df, version, filters=None, concurrent=True, max_workers=4):
+        self.page = page
+        self.df = df
+        self.version = version
+        self.filters = filters
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.tasks = []
+
+    def add(self, chart_id, build, data=None, **kwargs):
+        """Declare a chart at the current position; data replaces the page frame as build's input"""
+        data = self.df if data is None else data
+        if not self.concurrent:
+            plotly_chart(self.page, chart_id, build, data, self.version, self.filters, **kwargs)
+            return
+        placeholder = st.empty()
+        placeholder.info("⏳ Loading chart...")
+        self.tasks.append((placeholder, chart_id, build, data, kwargs))
+
+    def render(self):
+        """Build all pending figures concurrently and draw each as it completes"""
+        if not self.tasks:
+            return
+        ctx = get_script_run_ctx()
+
+        def build_figure(chart_id, build, data):
+            add_script_run_ctx(threading.current_thread(), ctx)
+            return get_figure(self.page, chart_id, build, data, self.version, self.filters)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.tasks))) as pool:
+            futures = {
+                pool.submit(build_figure, chart_id, build, data): (placeholder, kwargs)
+                for placeholder, chart_id, build, data, kwargs in self.tasks
+            }
+            for future in as_completed(futures):
+                placeholder, kwargs = futures[future]
+                placeholder.plotly_chart(future.result(), **kwargs)
+        self.tasks = []
@@ -1,30 +1,126 @@
 """
 PDF Report Generator for Hotel Booking Analysis
-Creates a professional client-ready PDF report with graphs
+Creates a professional client-ready PDF report with graphs and optional data
+appendices. Sections are generated one at a time and long tables are emitted
+in page-sized chunks, so only the current page's flowables are alive. reportlab
+still keeps every finished page until the file is saved; each page's stream is
+compressed as soon as it is finished, so that grows by a few KB per page.
+Charts are resampled to their box on the page before embedding
 """
 
+from reportlab import rl_config
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+from reportlab.pdfbase.pdfdoc import PDFArray, PDFDictionary, PDFName, PDFStream
+from reportlab.pdfgen.canvas import Canvas
 from datetime import datetime
+import hashlib
+import io
 import os
+import sys
+import time
+import tracemalloc
+import zlib
 
-def create_pdf_report():
-    """Generate professional PDF report"""
-    
-    # Create PDF
-    pdf_filename = "Hotel_Booking_Analysis_Report.pdf"
-    doc = SimpleDocTemplate(pdf_filename, pagesize=letter,
-                           rightMargin=72, leftMargin=72,
-                           topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Define styles
+import numpy as np
+from PIL import Image as PILImage
+
+from load_test import peak_rss_mb
+
+# Resolution charts are resampled to for the box they fill on the page
+REPORT_DPI = 150
+
+# Resampled charts, shared by every report built on this machine
+IMAGE_CACHE_DIR = os.environ.get(
+    'HOTEL_REPORT_IMAGE_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.report_image_cache')
+)
+
+# Appendix rows per table chunk; a chunk at the appendix font fits on one page
+ROWS_PER_TABLE = 50
+
+APPENDIX_HEADERS = {
+    'arrival_date_year': 'Year',
+    'arrival_month': 'Month',
+    'market_segment': 'Segment',
+    'distribution_channel': 'Channel',
+    'cancel_rate': 'Cancel %',
+    'adr': 'ADR ($)',
+}
+
+
+class FlowableStream(list):
+    """
+    Flowable list that refills itself from a generator of sections
+
+    doc.build() consumes flowables from the front while len() is non-zero, so
+    each section is generated only when the previous one has been laid out and
+    drawn, and drawn flowables are released straight away.
+    """
+
+    def __init__(self, sections):
+        super().__init__()
+        self.sections = iter(sections)
+
+    def __len__(self):
+        while not super().__len__():
+            section = next(self.sections, None)
+            if section is None:
+                return 0
+            self.extend(section)
+        return super().__len__()
+
+
+class CompressingCanvas(Canvas):
+    """
+    Canvas that deflates each page's content stream as soon as the page is finished
+
+    reportlab holds every finished page until save() and only compresses the
+    streams while writing the file, so an uncompressed appendix page (about
+    20 KB of drawing operators) is kept as a few KB instead.
+    """
+
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages[-1]
+        if page.compression and page.stream and not page.Contents:
+            stream = page.stream.encode('utf8') if isinstance(page.stream, str) else page.stream
+            page.Contents = PDFStream(PDFDictionary({'Filter': PDFArray([PDFName('FlateDecode')])}),
+                                      zlib.compress(stream))
+            page.stream = None
+
+
+def fitted_image(path, width, height, dpi=REPORT_DPI, cache_dir=IMAGE_CACHE_DIR):
+    """
+    Image flowable of a chart resampled to fit a width x height box at dpi
+
+    The chart keeps its aspect ratio, is flattened onto white and reduced to a
+    256-colour palette. Resampled files are named by a hash of the source file
+    and target size, so each distinct chart is resampled once for all reports.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    with PILImage.open(io.BytesIO(data)) as source:
+        scale = min(width / source.width, height / source.height)
+        pixels = tuple(min(size, max(1, round(size * scale / 72 * dpi))) for size in source.size)
+        target = os.path.join(cache_dir, hashlib.sha256(data + repr(pixels).encode()).hexdigest()[:24] + '.png')
+        if not os.path.exists(target):
+            rgba = source.convert('RGBA')
+            flat = PILImage.new('RGB', rgba.size, 'white')
+            flat.paste(rgba, mask=rgba.getchannel('A'))
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{target}.tmp-{os.getpid()}"
+            flat.resize(pixels, PILImage.LANCZOS).quantize(256).save(tmp_path, format='PNG', optimize=True)
+            os.replace(tmp_path, target)
+        return Image(target, width=source.width * scale, height=source.height * scale)
+
+
+def report_styles():
+    """Paragraph styles of the report"""
     styles = getSampleStyleSheet()
     
     # Custom styles
@@ -79,6 +175,28 @@ def create_pdf_report():
         backColor=colors.HexColor('#f0f2f6')
     )
     
+    footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=9, textColor=colors.grey,
+                                  alignment=TA_CENTER)
+    
+    appendix_style = ParagraphStyle('AppendixCell', parent=styles['Normal'], fontSize=7.5, leading=9)
+    
+    return {
+        'title': title_style,
+        'subtitle': subtitle_style,
+        'heading': heading_style,
+        'body': body_style,
+        'insight': insight_style,
+        'footer': footer_style,
+        'appendix': appendix_style,
+    }
+
+
+def report_sections(image_dir, styles):
+    """Generate the narrative of the report one section (list of flowables) at a time"""
+    title_style, subtitle_style = styles['title'], styles['subtitle']
+    heading_style, body_style, insight_style = styles['heading'], styles['body'], styles['insight']
+    elements = []
+    
     # Title Page
     elements.append(Spacer(1, 2*inch))
     elements.append(Paragraph("Hotel Booking Analysis", title_style))
@@ -87,6 +205,8 @@ def create_pdf_report():
     elements.append(Paragraph(f"Presented by: <b>Syed Muhammad Ali</b>", subtitle_style))
     elements.append(Paragraph(f"Date: {datetime.now().strftime('%B %d, %Y')}", subtitle_style))
     elements.append(PageBreak())
+    yield elements
+    elements = []
     
     # Executive Summary
     elements.append(Paragraph("Executive Summary", heading_style))
@@ -125,6 +245,8 @@ def create_pdf_report():
     
     elements.append(summary_table)
     elements.append(PageBreak())
+    yield elements
+    elements = []
     
     # Section 1: Cancellation Analysis
     elements.append(Paragraph("1. The Cancellation Challenge", heading_style))
@@ -135,8 +257,8 @@ def create_pdf_report():
     ))
     
     # Add graph 1
-    if os.path.exists('report_images/1_cancellation_distribution.png'):
-        img1 = Image('report_images/1_cancellation_distribution.png', width=5*inch, height=3.5*inch)
+    if os.path.exists(os.path.join(image_dir, '1_cancellation_distribution.png')):
+        img1 = fitted_image(os.path.join(image_dir, '1_cancellation_distribution.png'), 5*inch, 3.5*inch)
         elements.append(img1)
     
     elements.append(Paragraph(
@@ -148,6 +270,8 @@ def create_pdf_report():
         insight_style
     ))
     elements.append(PageBreak())
+    yield elements
+    elements = []
     
     # Section 2: Hotel Type Comparison
     elements.append(Paragraph("2. City vs Resort Hotels: A Tale of Two Properties", heading_style))
@@ -158,8 +282,8 @@ def create_pdf_report():
         body_style
     ))
     
-    if os.path.exists('report_images/2_hotel_comparison.png'):
-        img2 = Image('report_images/2_hotel_comparison.png', width=5*inch, height=3.5*inch)
+    if os.path.exists(os.path.join(image_dir, '2_hotel_comparison.png')):
+        img2 = fitted_image(os.path.join(image_dir, '2_hotel_comparison.png'), 5*inch, 3.5*inch)
         elements.append(img2)
     
     elements.append(Paragraph(
@@ -171,6 +295,8 @@ def create_pdf_report():
         insight_style
     ))
     elements.append(PageBreak())
+    yield elements
+    elements = []
     
     # Section 3: Pricing Analysis
     elements.append(Paragraph("3. Understanding Pricing Patterns", heading_style))
@@ -181,8 +307,8 @@ def create_pdf_report():
         body_style
     ))
     
-    if os.path.exists('report_images/3_adr_by_hotel.png'):
-        img3 = Image('report_images/3_adr_by_hotel.png', width=6*inch, height=3*inch)
+    if os.path.exists(os.path.join(image_dir, '3_adr_by_hotel.png')):
+        img3 = fitted_image(os.path.join(image_dir, '3_adr_by_hotel.png'), 6*inch, 3*inch)
         elements.append(img3)
     
     elements.append(Paragraph(
@@ -194,6 +320,8 @@ def create_pdf_report():
         insight_style
     ))
     elements.append(PageBreak())
+    yield elements
+    elements = []
     
     # Section 4: Seasonal Trends
     elements.append(Paragraph("4. Seasonal Booking Patterns", heading_style))
@@ -204,8 +332,8 @@ def create_pdf_report():
         body_style
     ))
     
-    if os.path.exists('report_images/4_monthly_cancellations.png'):
-        img4 = Image('report_images/4_monthly_cancellations.png', width=5*inch, height=3.5*inch)
+    if os.path.exists(os.path.join(image_dir, '4_monthly_cancellations.png')):
+        img4 = fitted_image(os.path.join(image_dir, '4_monthly_cancellations.png'), 5*inch, 3.5*inch)
         elements.append(img4)
     
     elements.append(Paragraph(
@@ -217,6 +345,8 @@ def create_pdf_report():
         insight_style
     ))
     elements.append(PageBreak())
+    yield elements
+    elements = []
     
     # Section 5: Geographic Analysis
     elements.append(Paragraph("5. The Portugal Problem: Geographic Insights", heading_style))
@@ -227,8 +357,8 @@ def create_pdf_report():
         body_style
     ))
     
-    if os.path.exists('report_images/5_top_countries.png'):
-        img5 = Image('report_images/5_top_countries.png', width=5*inch, height=4*inch)
+    if os.path.exists(os.path.join(image_dir, '5_top_countries.png')):
+        img5 = fitted_image(os.path.join(image_dir, '5_top_countries.png'), 5*inch, 4*inch)
         elements.append(img5)
     
     elements.append(Paragraph(
@@ -240,6 +370,8 @@ def create_pdf_report():
         insight_style
     ))
     elements.append(PageBreak())
+    yield elements
+    elements = []
     
     # Section 6: Price and Cancellation Relationship
     elements.append(Paragraph("6. The Price-Cancellation Connection", heading_style))
@@ -250,8 +382,8 @@ def create_pdf_report():
         body_style
     ))
     
-    if os.path.exists('report_images/6_adr_comparison.png'):
-        img6 = Image('report_images/6_adr_comparison.png', width=5.5*inch, height=3.5*inch)
+    if os.path.exists(os.path.join(image_dir, '6_adr_comparison.png')):
+        img6 = fitted_image(os.path.join(image_dir, '6_adr_comparison.png'), 5.5*inch, 3.5*inch)
         elements.append(img6)
     
     elements.append(Paragraph(
@@ -263,6 +395,8 @@ def create_pdf_report():
         insight_style
     ))
     elements.append(PageBreak())
+    yield elements
+    elements = []
     
     # Recommendations Section
     elements.append(Paragraph("Strategic Recommendations", heading_style))
@@ -303,6 +437,8 @@ def create_pdf_report():
     ))
     
     elements.append(PageBreak())
+    yield elements
+    elements = []
     
     # Expected Impact
     elements.append(Paragraph("Expected Business Impact", heading_style))
@@ -356,28 +492,133 @@ def create_pdf_report():
         "Data Analyst<br/>"
         f"Report Date: {datetime.now().strftime('%B %d, %Y')}<br/>"
         "Contact: Available for detailed analysis and implementation support",
-        ParagraphStyle('Footer', parent=styles['Normal'], fontSize=9, textColor=colors.grey, alignment=TA_CENTER)
+        styles['footer']
     ))
+    yield elements
+
+
+def _cells(values):
+    """Display strings for one appendix column"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        return [f"{value:,.1f}" for value in values]
+    if values.dtype.kind in 'iu':
+        return [f"{value:,}" for value in values]
+    return [str(value) for value in values]
+
+
+def appendix_table(rows, col_widths, style):
+    """One page-sized chunk of an appendix table, header repeated"""
+    header = [APPENDIX_HEADERS.get(name, name.replace('_', ' ').title()) for name in rows.columns]
+    body = list(zip(*(_cells(rows[name].to_numpy()) for name in rows.columns)))
+    table = Table([header, *body], colWidths=col_widths, rowHeights=11, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), style.fontSize),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 1),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f2f6')]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ]))
+    return table
+
+
+def appendix_sections(appendix, styles, width, rows_per_table=ROWS_PER_TABLE):
+    """
+    Generate appendix sections from {title: summary DataFrame}
+
+    Each table is sliced into chunks of rows_per_table rows built only when the
+    layout reaches them, so an appendix of any length holds one page of rows.
+    """
+    for title, table in appendix.items():
+        text_columns = [table[name].dtype.kind not in 'iuf' for name in table.columns]
+        weights = np.where(text_columns, 1.6, 1.0)
+        col_widths = list(width * weights / weights.sum())
+        yield [
+            PageBreak(),
+            Paragraph(title, styles['heading']),
+            Paragraph(f"{len(table):,} rows.", styles['body']),
+        ]
+        for start in range(0, len(table), rows_per_table):
+            yield [appendix_table(table.iloc[start:start + rows_per_table], col_widths, styles['appendix'])]
+
+
+def create_pdf_report(image_dir='report_images', pdf_filename="Hotel_Booking_Analysis_Report.pdf", appendix=None,
+                      trace_memory=False):
+    """
+    Generate professional PDF report
+
+    appendix maps section titles to summary DataFrames laid out as tables after
+    the narrative. Prints the page count, build time and the process's peak
+    RSS; with trace_memory also the peak Python allocation while building.
+    """
+    # Create PDF; page streams are compressed as pages are finished
+    doc = SimpleDocTemplate(pdf_filename, pagesize=letter,
+                           rightMargin=72, leftMargin=72,
+                           topMargin=72, bottomMargin=18, pageCompression=1)
+    styles = report_styles()
+    
+    def sections():
+        yield from report_sections(image_dir, styles)
+        if appendix:
+            yield from appendix_sections(appendix, styles, doc.width)
+    
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    
+    # Build PDF, pulling sections only as the layout reaches them; image streams
+    # are written as binary rather than ASCII85 text, which is a quarter larger
+    use_a85, rl_config.useA85 = rl_config.useA85, 0
+    try:
+        doc.build(FlowableStream(sections()), canvasmaker=CompressingCanvas)
+    finally:
+        rl_config.useA85 = use_a85
+    
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if started_tracing:
+        tracemalloc.stop()
     
-    # Build PDF
-    doc.build(elements)
     print(f"✅ PDF Report Generated: {pdf_filename}")
     print(f"📄 Location: {os.path.abspath(pdf_filename)}")
+    print(f"⏱️ Built {doc.page} pages in {elapsed:.2f}s, peak RSS {peak_rss_mb():.1f} MB"
+          + (f", peak traced allocation {peak / 2**20:.1f} MB" if peak is not None else ""))
     return pdf_filename
 
 if __name__ == "__main__":
     print("🔄 Generating professional PDF report...")
     print("=" * 60)
     
+    # Build the report images through the shared pipeline when the data is available
+    # --trace-memory reports the peak Python allocation too (tracing slows the build several times)
+    trace_memory = '--trace-memory' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--trace-memory']
+    source = args[0] if args else 'hotel_booking.csv'
+    appendix = None
+    if os.path.exists(source):
+        import pipeline
+        image_dir = pipeline.run('figures', source)
+        appendix = pipeline.run('appendix', source)
+    else:
+        image_dir = 'report_images'
+    
     # Check if images exist
-    required_images = [
-        'report_images/1_cancellation_distribution.png',
-        'report_images/2_hotel_comparison.png',
-        'report_images/3_adr_by_hotel.png',
-        'report_images/4_monthly_cancellations.png',
-        'report_images/5_top_countries.png',
-        'report_images/6_adr_comparison.png'
-    ]
+    required_images = [os.path.join(image_dir, name) for name in (
+        '1_cancellation_distribution.png',
+        '2_hotel_comparison.png',
+        '3_adr_by_hotel.png',
+        '4_monthly_cancellations.png',
+        '5_top_countries.png',
+        '6_adr_comparison.png'
+    )]
     
     missing_images = [img for img in required_images if not os.path.exists(img)]
     
@@ -385,13 +626,13 @@ if __name__ == "__main__":
         print("⚠️  Warning: Some images are missing:")
         for img in missing_images:
             print(f"   - {img}")
-        print("\n💡 Run the export cell in your notebook first to generate all images.")
+        print("\n💡 Place hotel_booking.csv next to this script (or pass its path) to generate all images.")
     else:
         print("✅ All graph images found!")
     
     print("\n🔄 Creating PDF...")
     try:
-        pdf_file = create_pdf_report()
+        pdf_file = create_pdf_report(image_dir=image_dir, appendix=appendix, trace_memory=trace_memory)
         print("\n" + "=" * 60)
         print("🎉 SUCCESS! Your professional PDF report is ready!")
         print("=" * 60)
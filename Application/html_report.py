@@ -0,0 +1,179 @@
+"""
+Static HTML export of the dashboard
+Renders every dashboard page into one self-contained HTML file with the
+dashboard's own chart builders. Figures carry only aggregated (and, for long
+time series, downsampled) values and plotly.js is inlined once, so the file
+opens instantly in a browser with no server and no row-level data.
+
+Usage:
+    python html_report.py --source hotel_booking.csv --output hotel_dashboard.html
+"""
+
+import argparse
+import html
+from datetime import datetime
+
+import numpy as np
+from plotly.offline import get_plotlyjs
+
+import charts
+import pipeline
+from dates import MONTH_NAMES
+from distributions import merge
+from drivers import driver_table
+
+# Points kept per line trace; longer series keep the min and max of each bucket
+MAX_POINTS = 400
+
+STYLE = """
+body { font-family: "Source Sans Pro", Arial, sans-serif; margin: 0; color: #262730; }
+nav { position: sticky; top: 0; background: #f0f2f6; padding: 10px 20px; z-index: 10; }
+nav a { margin-right: 16px; color: #1f77b4; text-decoration: none; font-weight: bold; }
+main { max-width: 1200px; margin: 0 auto; padding: 0 20px; }
+section { padding-top: 30px; }
+.main-header { font-size: 3rem; color: #1f77b4; text-align: center; font-weight: bold; margin-bottom: 0; }
+.sub-header { font-size: 1.5rem; color: #666; text-align: center; margin-bottom: 2rem; }
+.metrics { display: flex; gap: 16px; flex-wrap: wrap; }
+.metric-card { flex: 1; min-width: 180px; background: #fff; padding: 20px; border-radius: 10px;
+               box-shadow: 0 2px 4px rgba(0,0,0,0.1); text-align: center; }
+.metric-card .label { color: #666; font-size: 0.9rem; }
+.metric-card .value { font-size: 1.8rem; font-weight: bold; }
+table.data { border-collapse: collapse; width: 100%; font-size: 0.85rem; }
+table.data th { background: #1f77b4; color: #fff; padding: 6px; }
+table.data td { padding: 4px 6px; border-bottom: 1px solid #ddd; text-align: center; }
+footer { text-align: center; color: #666; padding: 20px; }
+"""
+
+
+def downsample(fig, max_points=MAX_POINTS):
+    """Thin every line trace longer than max_points to the min and max of each bucket"""
+    for trace in fig.data:
+        if trace.type != 'scatter' or 'lines' not in (trace.mode or 'lines') or trace.y is None:
+            continue
+        y = np.asarray(trace.y, dtype=np.float64)
+        n = len(y)
+        if n <= max_points:
+            continue
+        buckets = max_points // 2
+        stride = -(-n // buckets)
+        padded = np.concatenate([y, np.full(buckets * stride - n, y[-1])]).reshape(buckets, stride)
+        base = np.arange(buckets) * stride
+        keep = np.unique(np.minimum(np.concatenate([
+            base + padded.argmin(axis=1), base + padded.argmax(axis=1)
+        ]), n - 1))
+        updates = {}
+        for name in ('x', 'y', 'customdata', 'text'):
+            values = getattr(trace, name)
+            if values is not None and not isinstance(values, str) and len(values) == n:
+                updates[name] = np.asarray(values)[keep]
+        trace.update(updates)
+    return fig
+
+
+def page_figures(df, histograms, include_outliers=False):
+    """Figures of every dashboard page, from the bookings and the precomputed histograms"""
+    outlier_filter = None if include_outliers else [False]
+    lead_time = merge(histograms['lead_time'], is_outlier=outlier_filter)
+    adr = merge(histograms['adr'], is_outlier=outlier_filter)
+    return {
+        "📈 Overview": [charts.status_distribution(df), charts.hotel_status(df)],
+        "🚫 Cancellation Analysis": [charts.monthly_cancellations(df), charts.lead_time_means(df),
+                                    charts.lead_time_distribution(lead_time)],
+        "💰 Revenue Insights": [charts.adr_by_status(df), charts.adr_distribution(adr), charts.adr_by_hotel(df)],
+        "🌍 Geographic Analysis": [charts.top_country_cancellations(df), charts.country_cancel_rate(df)],
+        "📅 Seasonal Trends": [charts.monthly_cancelled_adr(df), charts.yearly_bookings(df)],
+        "🔗 Booking Channels": [charts.market_segment_all(df), charts.market_segment_cancelled(df),
+                               charts.segment_cancel_rate(df), charts.distribution_channel(df)],
+        "⏳ Booking Pace": [charts.booking_pace(df)],
+        "🧭 Cancellation Drivers": [charts.cancellation_drivers(driver_table(df))],
+    }
+
+
+def page_metrics(df):
+    """Headline (label, value) pairs of every dashboard page"""
+    cancelled = df['is_canceled'] == 1
+    adr_cancelled, adr_kept = df.loc[cancelled, 'adr'].mean(), df.loc[~cancelled, 'adr'].mean()
+    busiest_month = df['arrival_month'].value_counts().idxmax()
+    return {
+        "📈 Overview": [("Total Bookings", f"{len(df):,}"), ("Cancellation Rate", f"{cancelled.mean() * 100:.1f}%"),
+                       ("Avg Daily Rate", f"${df['adr'].mean():.2f}"), ("Hotel Types", f"{df['hotel'].nunique()}")],
+        "🚫 Cancellation Analysis": [
+            ("Avg Lead Time (Cancelled)", f"{df.loc[cancelled, 'lead_time'].mean():.0f} days"),
+            ("Avg Lead Time (Not Cancelled)", f"{df.loc[~cancelled, 'lead_time'].mean():.0f} days"),
+        ],
+        "💰 Revenue Insights": [("Avg ADR (Cancelled)", f"${adr_cancelled:.2f}"),
+                               ("Avg ADR (Not Cancelled)", f"${adr_kept:.2f}"),
+                               ("Difference", f"${adr_cancelled - adr_kept:.2f}")],
+        "🌍 Geographic Analysis": [("Countries", f"{df['country'].nunique()}"),
+                                  ("Most Cancellations", df.loc[cancelled, 'country'].value_counts().idxmax())],
+        "📅 Seasonal Trends": [("Busiest Arrival Month", MONTH_NAMES[busiest_month - 1])],
+        "🔗 Booking Channels": [("Market Segments", f"{df['market_segment'].nunique()}"),
+                               ("Top Segment", df['market_segment'].value_counts().idxmax())],
+        "⏳ Booking Pace": [("Avg Lead Time", f"{df['lead_time'].mean():.0f} days")],
+        "🧭 Cancellation Drivers": [("Overall Cancellation Rate", f"{cancelled.mean() * 100:.1f}%")],
+    }
+
+
+def render_html(figures, metrics, title="Hotel Booking Analysis Dashboard"):
+    """One HTML document with plotly.js inlined once and every page as a section"""
+    nav, sections = [], []
+    for number, (page, page_figs) in enumerate(figures.items(), start=1):
+        anchor = f"page-{number}"
+        nav.append(f'<a href="#{anchor}">{html.escape(page)}</a>')
+        cards = ''.join(
+            f'<div class="metric-card"><div class="label">{html.escape(label)}</div>'
+            f'<div class="value">{html.escape(value)}</div></div>'
+            for label, value in metrics.get(page, [])
+        )
+        plots = ''.join(
+            downsample(fig).to_html(full_html=False, include_plotlyjs=False, config={'displaylogo': False})
+            for fig in page_figs
+        )
+        sections.append(f'<section id="{anchor}"><h2>{html.escape(page)}</h2>'
+                        f'<div class="metrics">{cards}</div>{plots}</section>')
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>{STYLE}</style>
+<script type="text/javascript">{get_plotlyjs()}</script>
+</head>
+<body>
+<nav>{''.join(nav)}</nav>
+<main>
+<p class="main-header">🏨 {html.escape(title)}</p>
+<p class="sub-header">Presented by Syed Muhammad Ali</p>
+{''.join(sections)}
+</main>
+<footer>
+<p><strong>Hotel Booking Analysis Dashboard</strong> | Static export of {datetime.now().strftime('%B %d, %Y')}</p>
+<p>Presented by: Syed Muhammad Ali | Data Analyst</p>
+</footer>
+</body>
+</html>
+"""
+
+
+def export_html(source='hotel_booking.csv', output='hotel_dashboard.html', include_outliers=False):
+    """Write the static dashboard for a bookings CSV and return the output path"""
+    df = pipeline.run('enriched', source)
+    if not include_outliers:
+        df = df[~df['is_outlier']]
+    document = render_html(page_figures(df, pipeline.run('distributions', source), include_outliers),
+                           page_metrics(df))
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(document)
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export every dashboard page to one static HTML file")
+    parser.add_argument('--source', default='hotel_booking.csv', help="bookings CSV")
+    parser.add_argument('--output', default='hotel_dashboard.html', help="HTML file to write")
+    parser.add_argument('--include-outliers', action='store_true', help="keep rows flagged as ADR outliers")
+    args = parser.parse_args()
+
+    path = export_html(args.source, args.output, args.include_outliers)
+    print(f"✅ Exported the dashboard to {path}")
@@ -0,0 +1,298 @@
+"""
+Concurrent-session load test for the Hotel Booking Analysis Dashboard
+Simulates N analysts navigating the dashboard pages with think-times, using
+Streamlit's in-process AppTest driver against a generated dataset, and reports
+rerun latency percentiles, throughput and peak RSS. Runs entirely offline.
+
+Usage:
+    python load_test.py --sessions 8 --rows 200000 --output load_test_report.json
+    python load_test.py --sessions 8 --rows 200000 --compare previous_report.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dates import MONTH_NAMES
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, 'app.py')
+
+
+
+def make_dataset(rows, path, source=None, seed=0):
+    """
+    Write a dataset of `rows` bookings to `path`
+
+    With a source CSV the rows are resampled from it; otherwise synthetic rows
+    with the same schema and roughly the same distributions are generated.
+    """
+    rng = np.random.default_rng(seed)
+    if source:
+        df = pd.read_csv(source)
+        df = df.iloc[rng.integers(0, len(df), rows)].reset_index(drop=True)
+        df.to_csv(path, index=False)
+        return path
+
+    year = rng.choice([2015, 2016, 2017], rows)
+    month = rng.integers(1, 13, rows)
+    day = rng.integers(1, 29, rows)
+    arrival = pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': day}))
+    lead_time = rng.gamma(1.0, 104, rows).astype(int).clip(0, 737)
+    canceled = rng.random(rows) < 0.37
+    status_offset = np.where(canceled, (rng.random(rows) * lead_time).astype(int), -rng.integers(1, 8, rows))
+    status_date = arrival - pd.to_timedelta(status_offset, unit='D')
+
+    df = pd.DataFrame({
+        'hotel': rng.choice(['City Hotel', 'Resort Hotel'], rows, p=[0.66, 0.34]),
+        'is_canceled': canceled.astype(int),
+        'lead_time': lead_time,
+        'arrival_date_year': year,
+        'arrival_date_month': np.array(MONTH_NAMES)[month - 1],
+        'arrival_date_week_number': arrival.dt.isocalendar().week.to_numpy(),
+        'arrival_date_day_of_month': day,
+        'stays_in_weekend_nights': rng.integers(0, 3, rows),
+        'stays_in_week_nights': rng.integers(0, 6, rows),
+        'adults': rng.integers(1, 4, rows),
+        'children': np.where(rng.random(rows) < 0.0001, np.nan, rng.choice([0, 0, 0, 1, 2], rows)),
+        'babies': rng.choice([0, 0, 0, 0, 1], rows),
+        'meal': rng.choice(['BB', 'HB', 'FB', 'SC', 'Undefined'], rows, p=[0.77, 0.12, 0.01, 0.09, 0.01]),
+        'country': np.where(rng.random(rows) < 0.004, None,
+                            rng.choice(['PRT', 'GBR', 'FRA', 'ESP', 'DEU', 'ITA', 'IRL', 'BEL', 'BRA', 'NLD', 'USA', 'CHE'], rows)),
+        'market_segment': rng.choice(['Online TA', 'Offline TA/TO', 'Groups', 'Direct', 'Corporate', 'Complementary', 'Aviation'],
+                                     rows, p=[0.47, 0.2, 0.17, 0.1, 0.045, 0.01, 0.005]),
+        'distribution_channel': rng.choice(['TA/TO', 'Direct', 'Corporate', 'GDS'], rows, p=[0.82, 0.12, 0.055, 0.005]),
+        'is_repeated_guest': (rng.random(rows) < 0.03).astype(int),
+        'previous_cancellations': rng.choice([0, 0, 0, 0, 1], rows),
+        'previous_bookings_not_canceled': rng.choice([0, 0, 0, 0, 1], rows),
+        'reserved_room_type': rng.choice(list('ABDEFG'), rows),
+        'assigned_room_type': rng.choice(list('ABCDEFG'), rows),
+        'booking_changes': rng.choice([0, 0, 0, 1, 2], rows),
+        'deposit_type': rng.choice(['No Deposit', 'Non Refund', 'Refundable'], rows, p=[0.87, 0.12, 0.01]),
+        'agent': rng.integers(1, 500, rows).astype(float),
+        'company': np.where(rng.random(rows) < 0.06, rng.integers(1, 500, rows), np.nan),
+        'days_in_waiting_list': rng.choice([0, 0, 0, 0, 10], rows),
+        'customer_type': rng.choice(['Transient', 'Transient-Party', 'Contract', 'Group'], rows, p=[0.75, 0.21, 0.035, 0.005]),
+        'adr': np.round(rng.gamma(4.0, 25.0, rows), 2),
+        'required_car_parking_spaces': (rng.random(rows) < 0.06).astype(int),
+        'total_of_special_requests': rng.choice([0, 0, 1, 1, 2, 3], rows),
+        'reservation_status': np.where(canceled, 'Canceled', 'Check-Out'),
+        # Same unpadded day/month/year strings as the real dataset, e.g. 1/7/2015
+        'reservation_status_date': (status_date.dt.day.astype(str) + '/' + status_date.dt.month.astype(str)
+                                    + '/' + status_date.dt.year.astype(str)),
+    })
+    df.to_csv(path, index=False)
+    return path
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def install_shared_runtime():
+    """
+    Make every AppTest session share one mock Streamlit runtime
+
+    AppTest installs and clears a process-global mock runtime around each rerun,
+    which breaks when several sessions rerun at the same time. A real server has
+    a single runtime shared by all sessions, so the harness pins one for its
+    whole lifetime.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: shared)
+    Runtime.exists = classmethod(lambda cls: True)
+
+
+def run_session(session_id, navigations, think, timeout, seed, results):
+    """One simulated analyst: open the app, then visit random pages with think-times"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    start = time.perf_counter()
+    at.run()
+    results.append((session_id, 'first render', time.perf_counter() - start, bool(at.exception)))
+    if at.exception or not at.sidebar.radio:
+        return
+
+    pages = list(at.sidebar.radio[0].options)
+    for _ in range(navigations):
+        time.sleep(rng.uniform(*think))
+        target = rng.choice(pages)
+        start = time.perf_counter()
+        at.sidebar.radio[0].set_value(target).run()
+        results.append((session_id, target, time.perf_counter() - start, bool(at.exception)))
+
+
+def summarize(results, wall_time, args, initial_rss):
+    """Latency percentiles, throughput and memory for a finished run"""
+    latencies = np.array([latency for _, _, latency, _ in results])
+    page_latencies = {}
+    for _, page, latency, _ in results:
+        page_latencies.setdefault(page, []).append(latency)
+
+    def percentiles(values):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {'p50_s': round(float(p50), 4), 'p95_s': round(float(p95), 4),
+                'p99_s': round(float(p99), 4), 'count': len(values)}
+
+    import streamlit
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'config': {
+            'sessions': args.sessions, 'rows': args.rows, 'navigations': args.navigations,
+            'think_min_s': args.think_min, 'think_max_s': args.think_max, 'seed': args.seed,
+            'source': args.source,
+        },
+        'environment': {
+            'python': platform.python_version(), 'streamlit': streamlit.__version__,
+            'pandas': pd.__version__, 'platform': platform.platform(), 'cpus': os.cpu_count(),
+        },
+        'reruns': percentiles(latencies),
+        'pages': {page: percentiles(values) for page, values in sorted(page_latencies.items())},
+        'errors': sum(1 for *_, failed in results if failed),
+        'wall_time_s': round(wall_time, 2),
+        'throughput_reruns_per_s': round(len(results) / wall_time, 3),
+        'rss_before_mb': round(initial_rss, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def print_report(report, baseline=None):
+    def delta(path):
+        if baseline is None:
+            return ''
+        old, new = baseline, report
+        for key in path:
+            old = old.get(key) if isinstance(old, dict) else None
+            new = new[key]
+        if not isinstance(old, (int, float)) or not old:
+            return ''
+        return f"  ({(new - old) / old * 100:+.1f}% vs baseline)"
+
+    config = report['config']
+    print("=" * 60)
+    print(f"📊 Load test: {config['sessions']} sessions, {config['rows']:,} rows, "
+          f"{config['navigations']} page visits each")
+    print("=" * 60)
+    for name in ('p50_s', 'p95_s', 'p99_s'):
+        print(f"Rerun {name[:-2]:<4} {report['reruns'][name]:>9.3f} s{delta(('reruns', name))}")
+    print(f"Cold start  {report['cold_start_s']:>9.3f} s{delta(('cold_start_s',))}")
+    print(f"Throughput  {report['throughput_reruns_per_s']:>9.2f} reruns/s{delta(('throughput_reruns_per_s',))}")
+    print(f"Peak RSS    {report['peak_rss_mb']:>9.1f} MB{delta(('peak_rss_mb',))}")
+    print(f"Errors      {report['errors']:>9}")
+    print("\nPer page (p50 / p95 / p99 s):")
+    for page, stats in report['pages'].items():
+        print(f"  {page:<28} {stats['p50_s']:.3f} / {stats['p95_s']:.3f} / {stats['p99_s']:.3f}  (n={stats['count']})")
+
+
+def run_load_test(args, workdir, source, output, baseline):
+    """Generate the dataset in workdir, run the cold start and the sessions, and write the report"""
+    os.environ.setdefault('HOTEL_PIPELINE_CACHE', os.path.join(workdir, '.pipeline_cache'))
+    print(f"🔄 Generating {args.rows:,} bookings in {workdir}...")
+    make_dataset(args.rows, os.path.join(workdir, 'hotel_booking.csv'), source, args.seed)
+    os.chdir(workdir)
+
+    install_shared_runtime()
+    initial_rss = peak_rss_mb()
+
+    # Cold start: one session builds the store and warms the shared caches
+    print("🔄 Cold start...")
+    from streamlit.testing.v1 import AppTest
+    start = time.perf_counter()
+    cold = AppTest.from_file(APP_PATH, default_timeout=args.timeout).run()
+    cold_start = time.perf_counter() - start
+    if cold.exception:
+        print(f"❌ App failed to start: {cold.exception[0].message}")
+        sys.exit(1)
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=run_session,
+            args=(i, args.navigations, (args.think_min, args.think_max), args.timeout, args.seed, results),
+        )
+        for i in range(args.sessions)
+    ]
+    print(f"🔄 Running {args.sessions} concurrent sessions...")
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - start
+
+    if not results:
+        print("❌ No reruns completed")
+        sys.exit(1)
+
+    report = summarize(results, wall_time, args, initial_rss)
+    report['cold_start_s'] = round(cold_start, 3)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_report(report, baseline)
+    print(f"\n📁 Report: {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the dashboard")
+    parser.add_argument('--sessions', type=int, default=4, help="number of simultaneous analysts")
+    parser.add_argument('--rows', type=int, default=120000, help="dataset size in bookings")
+    parser.add_argument('--navigations', type=int, default=12, help="page visits per session")
+    parser.add_argument('--think-min', type=float, default=0.5, help="minimum think-time in seconds")
+    parser.add_argument('--think-max', type=float, default=3.0, help="maximum think-time in seconds")
+    parser.add_argument('--timeout', type=float, default=300, help="per-rerun timeout in seconds")
+    parser.add_argument('--source', help="CSV to resample rows from (default: synthetic data)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='load_test_report.json', help="where to write the JSON report")
+    parser.add_argument('--compare', help="previous JSON report to compare against")
+    parser.add_argument('--keep', action='store_true', help="keep the working directory (data, store, cache)")
+    args = parser.parse_args()
+
+    source = os.path.abspath(args.source) if args.source else None
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    # The app imports its sibling modules and reads hotel_booking.csv from the working directory
+    sys.path.insert(0, APP_DIR)
+    cwd, workdir = os.getcwd(), tempfile.mkdtemp(prefix='hotel_load_test_')
+    try:
+        run_load_test(args, workdir, source, output, baseline)
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"📁 Working directory kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Grouped robust outlier detection
+Bounds are computed per group (e.g. hotel x arrival month) from grouped
+quantiles read off one sort of (group, value), so there is no per-group
+Python loop; outliers are flagged rather than dropped
+"""
+
+import numpy as np
+import pandas as pd
+
+# Default multiplier of the spread for each method
+METHODS = {'iqr': 1.5, 'mad': 3.0}
+
+# Scales the median absolute deviation to the standard deviation for normal data
+MAD_SCALE = 1.4826
+
+
+def grouped_quantiles(values, groups, n_groups, q):
+    """
+    Quantiles of values per group code, interpolated linearly like pandas
+
+    Returns an array of shape (n_groups, len(q)); groups without values are NaN.
+    Values with a negative group code (no group) are ignored.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.int64)
+    valid = ~np.isnan(values) & (groups >= 0)
+    values, groups = values[valid], groups[valid]
+
+    # Sort by value, then stably by group; numpy radix-sorts small integer codes
+    by_value = np.argsort(values)
+    group_dtype = np.int16 if n_groups <= np.iinfo(np.int16).max else np.int64
+    ordered = values[by_value][np.argsort(groups[by_value].astype(group_dtype), kind='stable')]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+
+    result = np.full((n_groups, len(q)), np.nan)
+    present = counts > 0
+    last = counts[present, None] - 1
+    position = last * np.asarray(q, dtype=np.float64)[None, :]
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, last)
+    base = starts[present, None]
+    low, high = ordered[base + below], ordered[base + above]
+    result[present] = low + (high - low) * (position - below)
+    return result
+
+
+def outlier_bounds(df, column='adr', by=('hotel', 'arrival_month'), method='iqr', k=None):
+    """
+    Lower and upper bounds of column per group of the `by` keys
+
+    iqr: [Q1 - k * IQR, Q3 + k * IQR]; mad: median +/- k * scaled MAD.
+    Returns (bounds DataFrame indexed by the keys, group code of each row);
+    rows with a missing key get code -1 and take no part in any group's bounds.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown outlier method {method!r}; expected one of {', '.join(METHODS)}")
+    k = METHODS[method] if k is None else k
+
+    grouped = df.groupby(list(by), sort=True, observed=True)
+    # ngroup() leaves rows with a missing key as NaN (or -1 on older pandas)
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    index = grouped.size().index
+    values = df[column].to_numpy(dtype=np.float64)
+
+    if method == 'iqr':
+        q1, q3 = grouped_quantiles(values, codes, len(index), [0.25, 0.75]).T
+        lower, upper = q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+    else:
+        median = grouped_quantiles(values, codes, len(index), [0.5])[:, 0]
+        mad = grouped_quantiles(np.abs(values - median[codes]), codes, len(index), [0.5])[:, 0] * MAD_SCALE
+        lower, upper = median - k * mad, median + k * mad
+    return pd.DataFrame({'lower': lower, 'upper': upper}, index=index), codes
+
+
+def flag_outliers(df, column='adr', by=('hotel', 'arrival_month'), method='iqr', k=None):
+    """Boolean array marking rows outside their group's bounds; rows with a missing key are never flagged"""
+    bounds, codes = outlier_bounds(df, column, by, method, k)
+    values = df[column].to_numpy(dtype=np.float64)
+    grouped = codes >= 0
+    lower = np.append(bounds['lower'].to_numpy(), np.nan)[codes]
+    upper = np.append(bounds['upper'].to_numpy(), np.nan)[codes]
+    return grouped & ((values < lower) | (values > upper))
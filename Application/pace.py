@@ -0,0 +1,93 @@
+"""
+Booking pace (on-the-books) engine
+Builds the arrival date x days-before-arrival matrix of bookings on the books
+and of those that later cancel, with one scatter-add per quantity and a
+reverse cumulative sum instead of per-booking loops
+"""
+
+import numpy as np
+import pandas as pd
+
+from dates import keys_to_dates
+
+DEFAULT_MAX_DAYS = 365
+
+
+def _reverse_cumsum(counts, shape):
+    """counts[..., n] summed over all j >= n along the last axis"""
+    return counts.reshape(shape)[..., ::-1].cumsum(axis=-1)[..., ::-1]
+
+
+def pace_matrix(df, by='hotel', max_days=DEFAULT_MAX_DAYS):
+    """
+    Pace matrices per group, arrival date and days before arrival
+
+    Returns a dict with:
+        groups           group labels (first axis)
+        first_key        day key of the first arrival date (second axis offset)
+        on_books         bookings on the books N days before arrival
+        later_cancelled  of those, how many were cancelled afterwards
+    Both matrices have shape (groups, arrival dates, max_days + 1). Bookings made
+    more than max_days ahead count as on the books from max_days onwards.
+    """
+    arrival = df['arrival_key'].to_numpy(dtype=np.int64)
+    first_key = int(arrival.min())
+    n_arrivals = int(arrival.max()) - first_key + 1
+    width = max_days + 1
+
+    if by is None:
+        codes, groups = np.zeros(len(df), dtype=np.int64), ['All']
+    else:
+        codes, groups = pd.factorize(df[by], sort=True)
+        groups = list(groups)
+    shape = (len(groups), n_arrivals, width)
+    size = shape[0] * shape[1] * shape[2]
+
+    lead = np.clip(df['lead_time'].to_numpy(dtype=np.int64), 0, max_days)
+    cancelled = df['is_canceled'].to_numpy() == 1
+    # Days before arrival on which a cancelled booking left the books
+    cancel_days = np.clip(arrival - df['status_key'].to_numpy(dtype=np.int64), 0, lead)
+
+    row = (codes.astype(np.int64) * n_arrivals + (arrival - first_key)) * width
+    made = np.bincount(row + lead, minlength=size)
+    made_cancelled = np.bincount((row + lead)[cancelled], minlength=size)
+    left_books = np.bincount((row + cancel_days)[cancelled], minlength=size)
+
+    left_before = _reverse_cumsum(left_books, shape)
+    return {
+        'groups': groups,
+        'first_key': first_key,
+        'on_books': (_reverse_cumsum(made, shape) - left_before).astype(np.int32),
+        'later_cancelled': (_reverse_cumsum(made_cancelled, shape) - left_before).astype(np.int32),
+    }
+
+
+def pace_curves(df, by='hotel', max_days=DEFAULT_MAX_DAYS):
+    """
+    Pace curves per group and arrival year, as a long DataFrame
+
+    Each curve sums the pace matrix over all arrival dates of the year, giving
+    the bookings on the books (and later cancelled) N days before arrival.
+    """
+    pace = pace_matrix(df, by=by, max_days=max_days)
+    n_arrivals = pace['on_books'].shape[1]
+    years = pd.DatetimeIndex(keys_to_dates(pace['first_key'] + np.arange(n_arrivals))).year.to_numpy()
+    starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+
+    on_books = np.add.reduceat(pace['on_books'], starts, axis=1)
+    later_cancelled = np.add.reduceat(pace['later_cancelled'], starts, axis=1)
+    days_before = np.arange(max_days + 1)
+
+    n_groups, n_years = on_books.shape[:2]
+    curves = pd.DataFrame({
+        'group': np.repeat(pace['groups'], n_years * len(days_before)),
+        'year': np.tile(np.repeat(years[starts], len(days_before)), n_groups),
+        'days_before': np.tile(days_before, n_groups * n_years),
+        'on_books': on_books.ravel(),
+        'later_cancelled': later_cancelled.ravel(),
+    })
+    # Drop group/year combinations without any arrivals
+    final = curves.groupby(['group', 'year'])['on_books'].transform('max')
+    curves = curves[final > 0].reset_index(drop=True)
+    curves['pct_of_final'] = curves['on_books'] / curves.groupby(['group', 'year'])['on_books'].transform('first') * 100
+    return curves
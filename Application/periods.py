@@ -0,0 +1,142 @@
+"""
+Period-over-period comparison from precomputed daily aggregates
+Bookings, cancellations, ADR and lead time sums are accumulated per arrival
+day for every hotel x breakdown value x outlier flag and stored as prefix
+sums, so the totals of any period are one subtraction and two periods are
+compared without touching the bookings again. Cancellation driver counts
+are kept the same way per hotel x outlier flag
+"""
+
+import numpy as np
+import pandas as pd
+
+from dates import MONTH_NAMES
+from drivers import driver_counts, score
+
+BREAKDOWNS = ['hotel', 'is_canceled', 'arrival_month', 'market_segment', 'distribution_channel',
+              'customer_type', 'deposit_type', 'country']
+MEASURES = ['bookings', 'cancellations', 'adr_sum', 'lead_time_sum']
+
+# Countries outside the most frequent ones are pooled to bound the cube size
+TOP_COUNTRIES = 30
+
+
+def build_cubes(df):
+    """
+    Prefix sums of the daily measures for every breakdown
+
+    Returns {'first_key', 'n_days', 'cubes', 'drivers'}; cubes maps each
+    breakdown to its group index (hotel, breakdown value, is_outlier) and a
+    (days + 1, groups, measures) array of cumulative sums over arrival days.
+    drivers holds the cancellation driver counts per (hotel, is_outlier) as a
+    (days + 1, groups, values + 2, 2) array of cumulative bookings and
+    cancellations; the last two value slots are missing values and totals.
+    """
+    days = df['arrival_key'].to_numpy(dtype=np.int64)
+    first_key = int(days.min()) if len(days) else 0
+    n_days = int(days.max()) - first_key + 1 if len(days) else 0
+    weights = [
+        None,
+        df['is_canceled'].to_numpy(dtype=np.float64),
+        df['adr'].to_numpy(dtype=np.float64),
+        df['lead_time'].to_numpy(dtype=np.float64),
+    ]
+
+    cubes = {}
+    for breakdown in BREAKDOWNS:
+        values = df[breakdown]
+        if breakdown == 'country':
+            top = values.value_counts().index[:TOP_COUNTRIES]
+            values = values.where(values.isin(top), 'Other')
+        keys = pd.DataFrame({'hotel': df['hotel'], breakdown: values, 'is_outlier': df['is_outlier']})
+        grouped = keys.groupby(list(keys.columns), sort=True, observed=True, dropna=False)
+        codes = grouped.ngroup().to_numpy(dtype=np.int64)
+        index = grouped.size().index
+
+        cells = (days - first_key) * len(index) + codes
+        size = n_days * len(index)
+        daily = np.stack([np.bincount(cells, weights=w, minlength=size) for w in weights], axis=-1)
+        cumulative = np.zeros((n_days + 1, len(index), len(MEASURES)))
+        np.cumsum(daily.reshape(n_days, len(index), len(MEASURES)), axis=0, out=cumulative[1:])
+        cubes[breakdown] = {'index': index, 'cumulative': cumulative}
+
+    # Driver counts per arrival day x (hotel, is_outlier), plus each cell's totals
+    grouped = df.groupby(['hotel', 'is_outlier'], sort=True, observed=True, dropna=False)
+    index = grouped.size().index
+    cells = (days - first_key) * len(index) + grouped.ngroup().to_numpy(dtype=np.int64)
+    size = n_days * len(index)
+    labels, counts = driver_counts(df, cells, size)
+    totals = np.stack([np.bincount(cells, minlength=size),
+                       np.bincount(cells, weights=weights[1], minlength=size).astype(np.int64)], axis=-1)
+    daily = np.concatenate([counts, totals[:, None, :]], axis=1)
+    cumulative = np.zeros((n_days + 1, len(index)) + daily.shape[1:], dtype=np.int64)
+    np.cumsum(daily.reshape((n_days, len(index)) + daily.shape[1:]), axis=0, out=cumulative[1:])
+    drivers = {'index': index, 'labels': labels, 'cumulative': cumulative}
+    return {'first_key': first_key, 'n_days': n_days, 'cubes': cubes, 'drivers': drivers}
+
+
+def _day_range(cubes, start_key, end_key):
+    """Rows of the cumulative arrays bounding arrival days start_key..end_key (inclusive)"""
+    start = int(np.clip(start_key - cubes['first_key'], 0, cubes['n_days']))
+    stop = int(np.clip(end_key - cubes['first_key'] + 1, start, cubes['n_days']))
+    return start, stop
+
+
+def _group_mask(index, hotels=None, include_outliers=False):
+    """Groups of a cube index matching the hotel selection and outlier setting"""
+    keep = np.ones(len(index), dtype=bool)
+    if hotels is not None:
+        keep &= index.get_level_values('hotel').isin(list(hotels))
+    if not include_outliers:
+        keep &= ~index.get_level_values('is_outlier').astype(bool)
+    return keep
+
+
+def period_totals(cubes, breakdown, start_key, end_key, hotels=None, include_outliers=False):
+    """Measures summed over arrival days start_key..end_key (inclusive) per breakdown value"""
+    cube = cubes['cubes'][breakdown]
+    start, stop = _day_range(cubes, start_key, end_key)
+    totals = pd.DataFrame(cube['cumulative'][stop] - cube['cumulative'][start],
+                          index=cube['index'], columns=MEASURES)
+    totals = totals[_group_mask(cube['index'], hotels, include_outliers)].groupby(level=breakdown).sum()
+    if breakdown == 'arrival_month':
+        totals.index = pd.Index([MONTH_NAMES[month - 1] for month in totals.index], name=breakdown)
+    return totals
+
+
+def kpis(totals):
+    """Bookings, cancellations, cancellation rate, mean ADR and mean lead time from summed measures"""
+    totals = pd.DataFrame(totals)
+    bookings = totals['bookings'].replace(0, np.nan)
+    return pd.DataFrame({
+        'bookings': totals['bookings'],
+        'cancellations': totals['cancellations'],
+        'cancel_rate': totals['cancellations'] / bookings * 100,
+        'adr': totals['adr_sum'] / bookings,
+        'lead_time': totals['lead_time_sum'] / bookings,
+    }, index=totals.index)
+
+
+def compare(current, baseline):
+    """KPIs of two periods side by side with their differences (current - baseline)"""
+    current, baseline = current.align(baseline, join='outer', fill_value=0)
+    a, b = kpis(current), kpis(baseline)
+    table = pd.concat(
+        {metric: pd.DataFrame({'current': a[metric], 'baseline': b[metric], 'delta': a[metric] - b[metric]})
+         for metric in a.columns},
+        axis=1
+    )
+    if table.index.name == 'arrival_month':
+        # Months keep calendar order; other breakdowns are ranked by current volume
+        return table.reindex([month for month in MONTH_NAMES if month in table.index])
+    return table.sort_values(('bookings', 'current'), ascending=False)
+
+
+def period_drivers(cubes, start_key, end_key, hotels=None, include_outliers=False, min_support=0.005):
+    """Cancellation driver table (see drivers.driver_table) for arrival days start_key..end_key"""
+    cube = cubes['drivers']
+    start, stop = _day_range(cubes, start_key, end_key)
+    counts = cube['cumulative'][stop] - cube['cumulative'][start]
+    counts = counts[_group_mask(cube['index'], hotels, include_outliers)].sum(axis=0)
+    n, n_cancelled = counts[-1]
+    return score(cube['labels'], counts[:-2, 0], counts[:-2, 1], n, n_cancelled, min_support)
@@ -0,0 +1,395 @@
+"""
+Shared data pipeline for the notebook, the dashboard and the PDF report
+Stages form a DAG (raw -> validated -> cleaned -> [date_dim] -> enriched -> aggregates -> figures
+-> report, with enriched -> appendix also feeding the report, and validated -> quarantine,
+enriched -> distributions and enriched -> period_cubes feeding the dashboard).
+Each stage's output is memoized on disk under a key derived from the stage's
+code, the project modules it uses and its inputs' keys, so only stale stages
+recompute and every consumer reuses the work of the others. Only the most
+recently used versions of each stage are kept.
+
+Usage: python pipeline.py [stage] [hotel_booking.csv]
+"""
+
+import ast
+import hashlib
+import inspect
+import os
+import pickle
+import re
+import shutil
+
+from dates import build_date_dimension, keys_to_dates
+from distributions import build_histograms
+from outliers import flag_outliers
+from periods import build_cubes
+from validation import read_bookings, reason_counts, validate
+
+CACHE_DIR = os.environ.get(
+    'HOTEL_PIPELINE_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.pipeline_cache')
+)
+
+REPORT_IMAGES = [
+    '1_cancellation_distribution.png',
+    '2_hotel_comparison.png',
+    '3_adr_by_hotel.png',
+    '4_monthly_cancellations.png',
+    '5_top_countries.png',
+    '6_adr_comparison.png',
+]
+
+# Cached versions (source or code changes) kept per stage; older ones are deleted
+KEEP_VERSIONS = int(os.environ.get('HOTEL_PIPELINE_KEEP', 2))
+
+# name -> (function, dependency names, writes_files)
+STAGES = {}
+
+# Stages recomputed on every run instead of cached, e.g. a plain copy of the source
+TRANSIENT_STAGES = set()
+
+
+def stage(*deps, writes_files=False, persist=True):
+    """Register a pipeline stage; a stage without deps reads the source file"""
+    def register(fn):
+        STAGES[fn.__name__] = (fn, deps, writes_files)
+        if not persist:
+            TRANSIENT_STAGES.add(fn.__name__)
+        return fn
+    return register
+
+
+def file_digest(path):
+    """Content hash of the source file, so copies in other folders share a key"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# source path -> (digest, project modules it imports), filled once per process
+_module_info = {}
+
+
+def _module_path(name):
+    """Source file of a project module, or None for third-party and built-in modules"""
+    path = os.path.join(MODULE_DIR, f"{name.split('.')[0]}.py")
+    return path if os.path.isfile(path) and path != os.path.abspath(__file__) else None
+
+
+def _module(path):
+    """Content hash of a project module and the project modules it imports"""
+    if path not in _module_info:
+        with open(path, 'rb') as f:
+            text = f.read()
+        imported = set()
+        for node in ast.walk(ast.parse(text)):
+            if isinstance(node, ast.Import):
+                imported.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                imported.add(node.module)
+        _module_info[path] = (hashlib.sha256(text).hexdigest(), {p for p in map(_module_path, imported) if p})
+    return _module_info[path]
+
+
+def _code_names(code):
+    """Global names used by a code object and the functions nested in it"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+def code_digest(fn):
+    """
+    Hash of a stage's source, the pipeline helpers and constants it uses, and
+    every project module it imports (directly, lazily or through other modules)
+    """
+    h = hashlib.sha256()
+    paths, pending, seen = set(), [fn], {fn}
+    while pending:
+        current = pending.pop()
+        h.update(inspect.getsource(current).encode())
+        for name in sorted(_code_names(current.__code__)):
+            obj = current.__globals__.get(name)
+            module = obj.__name__ if inspect.ismodule(obj) else getattr(obj, '__module__', None) or name
+            if module == __name__:
+                if inspect.isfunction(obj) and obj not in seen and obj.__name__ not in STAGES:
+                    seen.add(obj)
+                    pending.append(obj)
+                elif not callable(obj) and not inspect.ismodule(obj):
+                    h.update(f"{name}={obj!r}".encode())
+            elif _module_path(module):
+                paths.add(_module_path(module))
+
+    # Close over the imports of the project modules found so far
+    pending = list(paths)
+    while pending:
+        for path in _module(pending.pop())[1] - paths:
+            paths.add(path)
+            pending.append(path)
+    for path in sorted(paths):
+        h.update(_module(path)[0].encode())
+    return h.hexdigest()
+
+
+def stage_key(name, source, _keys=None):
+    """Key of a stage: hash of its code (see code_digest) plus the keys of its inputs"""
+    keys = {} if _keys is None else _keys
+    if name not in keys:
+        fn, deps, _ = STAGES[name]
+        h = hashlib.sha256()
+        h.update(name.encode())
+        h.update(code_digest(fn).encode())
+        if deps:
+            for dep in deps:
+                h.update(stage_key(dep, source, keys).encode())
+        else:
+            if source not in keys:
+                keys[source] = file_digest(source)
+            h.update(keys[source].encode())
+        keys[name] = h.hexdigest()[:16]
+    return keys[name]
+
+
+def run(name, source='hotel_booking.csv'):
+    """Return the output of a stage, recomputing only stale stages"""
+    return _run(name, source, {}, {})
+
+
+def prune(name, keep=KEEP_VERSIONS):
+    """Delete all but the `keep` most recently used cached versions of a stage"""
+    pattern = re.compile(rf"{re.escape(name)}-([0-9a-f]{{16}})\.pkl")
+    try:
+        entries = os.listdir(CACHE_DIR)
+    except FileNotFoundError:
+        return
+    versions = [match[1] for match in map(pattern.fullmatch, entries) if match]
+    versions.sort(key=lambda key: os.path.getmtime(os.path.join(CACHE_DIR, f"{name}-{key}.pkl")), reverse=True)
+    for key in versions[keep:]:
+        try:
+            os.remove(os.path.join(CACHE_DIR, f"{name}-{key}.pkl"))
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(os.path.join(CACHE_DIR, f"{name}-{key}"), ignore_errors=True)
+
+
+def _run(name, source, keys, results):
+    if name in results:
+        return results[name]
+
+    key = stage_key(name, source, keys)
+    path = os.path.join(CACHE_DIR, f"{name}-{key}.pkl")
+    persist = name not in TRANSIENT_STAGES
+    if persist and os.path.exists(path):
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+        # A hit marks the version as recently used for prune()
+        os.utime(path)
+    else:
+        fn, deps, writes_files = STAGES[name]
+        inputs = [_run(dep, source, keys, results) for dep in deps] if deps else [source]
+        if writes_files:
+            workdir = os.path.join(CACHE_DIR, f"{name}-{key}")
+            os.makedirs(workdir, exist_ok=True)
+            inputs.append(workdir)
+        value = fn(*inputs)
+
+        if persist:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.tmp-{os.getpid()}"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        prune(name, keep=KEEP_VERSIONS if persist else 0)
+
+    results[name] = value
+    return value
+
+
+# Stages
+@stage(persist=False)
+def raw(source):
+    return read_bookings(source)
+
+
+@stage('raw')
+def validated(df):
+    bookings, rejected = validate(df)
+    return {'bookings': bookings, 'rejected': rejected}
+
+
+@stage('validated', writes_files=True)
+def quarantine(checked, workdir):
+    path = os.path.join(workdir, 'quarantine.csv')
+    checked['rejected'].to_csv(path, index=False)
+    return {
+        'path': path,
+        'valid_rows': len(checked['bookings']),
+        'rejected_rows': len(checked['rejected']),
+        'reasons': reason_counts(checked['rejected']),
+    }
+
+
+@stage('validated')
+def cleaned(checked):
+    df = checked['bookings'].drop(['company', 'agent'], axis=1, errors='ignore')
+    df['children'] = df['children'].fillna(df['children'].median())
+    df['country'] = df['country'].fillna('Unknown')
+    # Day keys were parsed during validation; rows with invalid dates are quarantined
+    df['reservation_status_date'] = keys_to_dates(df['status_key'])
+
+    # Flag (rather than drop) ADR outliers against each hotel's bounds for the arrival month
+    df['is_outlier'] = flag_outliers(df, 'adr', by=['hotel', 'arrival_month'], method='iqr')
+    return df
+
+
+@stage('cleaned')
+def date_dim(df):
+    if df.empty:
+        # Every row was quarantined: an empty dimension keeps the downstream stages empty too
+        return build_date_dimension(0, -1)
+    first = min(df['status_key'].min(), df['arrival_key'].min())
+    last = max(df['status_key'].max(), df['arrival_key'].max())
+    return build_date_dimension(first, last)
+
+
+@stage('cleaned', 'date_dim')
+def enriched(df, dim):
+    df = df.copy()
+    # Join on the day key by position in the contiguous dimension table
+    status_pos = df['status_key'].to_numpy() - (dim.index[0] if len(dim) else 0)
+    df['month'] = dim['month'].to_numpy()[status_pos]
+    df['year'] = dim['year'].to_numpy()[status_pos]
+    return df
+
+
+def daily_by_key(series):
+    """Replace the day-key level of a (group, day key) indexed series with dates"""
+    return series.set_axis(series.index.set_levels(keys_to_dates(series.index.levels[1]), level=1))
+
+
+@stage('enriched')
+def aggregates(df):
+    df = df[~df['is_outlier']]
+    cancelled = df[df['is_canceled'] == 1]
+    in_2016_2017 = df[(df['year'] >= 2016) & (df['year'] <= 2017)]
+    return {
+        'status_counts': df['is_canceled'].value_counts().sort_index(),
+        'hotel_status': df.groupby(['hotel', 'is_canceled']).size().unstack(fill_value=0),
+        'hotel_adr_daily': daily_by_key(df.groupby(['hotel', 'status_key'])['adr'].mean()),
+        'monthly_status': df.groupby(['month', 'is_canceled']).size().unstack(fill_value=0),
+        'top_cancel_countries': cancelled['country'].value_counts().head(10),
+        'status_adr_daily': daily_by_key(in_2016_2017.groupby(['is_canceled', 'status_key'])['adr'].mean()),
+    }
+
+
+def booking_summary(df, keys):
+    """Bookings, cancellations, cancellation rate (%) and mean ADR per group of keys"""
+    summary = df.groupby(keys, observed=True).agg(
+        bookings=('is_canceled', 'size'), cancellations=('is_canceled', 'sum'), adr=('adr', 'mean')
+    ).reset_index()
+    summary.insert(len(keys) + 2, 'cancel_rate', summary['cancellations'] / summary['bookings'] * 100)
+    return summary
+
+
+@stage('enriched')
+def appendix(df):
+    df = df[~df['is_outlier']]
+    return {
+        'Appendix A: Market Segments by Arrival Month': booking_summary(
+            df, ['hotel', 'market_segment', 'distribution_channel', 'arrival_date_year', 'arrival_month']
+        ),
+        'Appendix B: Countries by Arrival Year': booking_summary(df, ['hotel', 'country', 'arrival_date_year']),
+    }
+
+
+@stage('enriched')
+def distributions(df):
+    return build_histograms(df)
+
+
+@stage('enriched')
+def period_cubes(df):
+    return build_cubes(df)
+
+
+@stage('aggregates', writes_files=True)
+def figures(agg, workdir):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    def save(fig, name):
+        fig.savefig(os.path.join(workdir, name), dpi=150, bbox_inches='tight')
+        plt.close(fig)
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.bar(['Not Cancelled', 'Cancelled'], agg['status_counts'].values, color=['#2ecc71', '#e74c3c'])
+    ax.set_title('Booking Cancellation Distribution')
+    ax.set_ylabel('Number of Bookings')
+    save(fig, REPORT_IMAGES[0])
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    agg['hotel_status'].rename(columns={0: 'Not Cancelled', 1: 'Cancelled'}).plot.bar(ax=ax, color=['#2ecc71', '#e74c3c'], rot=0)
+    ax.set_title('Reservation status in different Hotels', size=20)
+    ax.set_xlabel('Hotel')
+    ax.set_ylabel('Number of Bookings')
+    save(fig, REPORT_IMAGES[1])
+
+    fig, ax = plt.subplots(figsize=(20, 8))
+    hotel_adr = agg['hotel_adr_daily']
+    for hotel, color in [('Resort Hotel', 'green'), ('City Hotel', 'orange')]:
+        if hotel in hotel_adr.index.get_level_values(0):
+            ax.plot(hotel_adr.loc[hotel].index, hotel_adr.loc[hotel].values, label=hotel, color=color)
+    ax.set_title('Average Daily Rate in City and Resort Hotel', fontsize=30)
+    ax.legend(fontsize=20)
+    save(fig, REPORT_IMAGES[2])
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    agg['monthly_status'].rename(columns={0: 'not cancelled', 1: 'cancelled'}).plot.bar(ax=ax, rot=0)
+    ax.set_title('Monthly Booking Cancellations', size=16)
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Number of Bookings')
+    save(fig, REPORT_IMAGES[3])
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    top_countries = agg['top_cancel_countries']
+    ax.pie(top_countries.values, labels=top_countries.index, autopct='%1.1f%%', startangle=140)
+    ax.set_title('Top 10 Countries with Highest Cancellations', size=16)
+    ax.axis('equal')
+    save(fig, REPORT_IMAGES[4])
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+    status_adr = agg['status_adr_daily']
+    for status, label, color in [(1, 'Cancelled Bookings', 'red'), (0, 'Not Cancelled Bookings', 'green')]:
+        if status in status_adr.index.get_level_values(0):
+            ax.plot(status_adr.loc[status].index, status_adr.loc[status].values, label=label, color=color)
+    ax.legend(fontsize=20)
+    ax.set_title('Average Daily Rate (2016-2017): Cancelled vs Not Cancelled', fontsize=16)
+    save(fig, REPORT_IMAGES[5])
+
+    return workdir
+
+
+@stage('figures', 'appendix', writes_files=True)
+def report(image_dir, appendix, workdir):
+    from generate_pdf_report import create_pdf_report
+    return create_pdf_report(
+        image_dir=image_dir,
+        pdf_filename=os.path.join(workdir, 'Hotel_Booking_Analysis_Report.pdf'),
+        appendix=appendix
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else 'report'
+    source = sys.argv[2] if len(sys.argv) > 2 else 'hotel_booking.csv'
+    result = run(target, source)
+    print(f"✅ {target}: {result if isinstance(result, str) else type(result).__name__}")
@@ -0,0 +1,176 @@
+"""
+Validation and quarantine for the hotel booking data
+Every rule is a vectorized check over whole columns; rows failing any rule are
+set aside with the reasons instead of failing the whole load, and only a
+missing column stops the pipeline
+"""
+
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from dates import MONTH_NAMES, day_keys_from_parts, keys_to_dates, month_numbers, parse_day_keys
+
+NUMERIC_COLUMNS = [
+    'is_canceled', 'lead_time', 'arrival_date_year', 'arrival_date_day_of_month',
+    'stays_in_weekend_nights', 'stays_in_week_nights', 'adults', 'children', 'babies',
+    'is_repeated_guest', 'previous_cancellations', 'booking_changes', 'days_in_waiting_list',
+    'adr', 'required_car_parking_spaces', 'total_of_special_requests',
+]
+TEXT_COLUMNS = [
+    'hotel', 'arrival_date_month', 'meal', 'country', 'market_segment', 'distribution_channel',
+    'reserved_room_type', 'assigned_room_type', 'deposit_type', 'customer_type',
+    'reservation_status_date',
+]
+REQUIRED_COLUMNS = NUMERIC_COLUMNS + TEXT_COLUMNS
+
+# Numeric columns restored to integers once bad rows are removed
+INTEGER_COLUMNS = [column for column in NUMERIC_COLUMNS if column not in ('children', 'adr')]
+
+# Columns whose missing values are filled during cleaning
+NULLABLE_COLUMNS = ['children', 'country']
+
+NON_NEGATIVE_COLUMNS = [
+    'lead_time', 'stays_in_weekend_nights', 'stays_in_week_nights', 'adults', 'children', 'babies',
+    'previous_cancellations', 'booking_changes', 'days_in_waiting_list', 'adr',
+    'required_car_parking_spaces', 'total_of_special_requests',
+]
+
+# Free-text columns that must hold a non-blank value; any property name is accepted
+# so feeds from new hotels are not quarantined
+NON_BLANK_COLUMNS = ['hotel']
+
+DOMAINS = {
+    'arrival_date_month': MONTH_NAMES,
+    'market_segment': ['Aviation', 'Complementary', 'Corporate', 'Direct', 'Groups',
+                       'Offline TA/TO', 'Online TA', 'Undefined'],
+    'distribution_channel': ['Corporate', 'Direct', 'GDS', 'TA/TO', 'Undefined'],
+    'is_canceled': [0, 1],
+}
+
+SKIPPED_LINE = re.compile(r'Skipping line (\d+): (.*)')
+
+
+class SchemaError(ValueError):
+    """The data file lacks columns the pipeline needs"""
+
+
+def read_bookings(source):
+    """
+    Read the bookings CSV, skipping lines with the wrong number of fields
+
+    The skipped lines are kept in df.attrs['malformed_lines'] as (line, message).
+    """
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', pd.errors.ParserWarning)
+        df = pd.read_csv(source, on_bad_lines='warn')
+    df.attrs['malformed_lines'] = [
+        (int(line), message)
+        for warning in caught if issubclass(warning.category, pd.errors.ParserWarning)
+        for line, message in SKIPPED_LINE.findall(str(warning.message))
+    ]
+    return df
+
+
+def source_lines(n_rows, malformed_lines):
+    """File line number of each parsed row, accounting for the header and skipped lines"""
+    lines = np.arange(n_rows, dtype=np.int64) + 2
+    skipped = np.sort([line for line, _ in malformed_lines]).astype(np.int64)
+    # The j-th skipped line shifts every row whose unshifted line is >= skipped[j] - j
+    return lines + np.searchsorted(skipped - np.arange(len(skipped)), lines, side='right')
+
+
+def validate(df):
+    """
+    Split bookings into valid rows and rejected rows
+
+    Returns (bookings, rejected). bookings has numeric columns coerced and the
+    parsed day keys status_key, arrival_month and arrival_key added; rejected
+    holds the rows as read, with their file line and a 'reasons' column.
+    Raises SchemaError if required columns are missing.
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in df]
+    if missing:
+        raise SchemaError(f"The data file is missing required columns: {', '.join(missing)}")
+
+    checks = []
+
+    # Numeric columns: parse text columns, then check for missing and negative values
+    numeric = {}
+    for column in NUMERIC_COLUMNS:
+        values = df[column]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors='coerce')
+            checks.append((f"{column} is not a number", values.isna() & df[column].notna()))
+        if column not in NULLABLE_COLUMNS:
+            checks.append((f"{column} is missing", df[column].isna()))
+        if column in NON_NEGATIVE_COLUMNS:
+            checks.append((f"negative {column}", values < 0))
+        numeric[column] = values
+
+    for column in NON_BLANK_COLUMNS:
+        checks.append((f"{column} is missing", df[column].isna() | (df[column].astype(str).str.strip() == '')))
+
+    # Categorical columns: values outside the domain, telling missing values apart
+    for column, allowed in DOMAINS.items():
+        values = numeric.get(column, df[column])
+        outside = ~values.isin(allowed).to_numpy()
+        missing = np.zeros(len(df), dtype=bool)
+        missing[outside] = values[outside].isna().to_numpy()
+        if column not in numeric:
+            checks.append((f"{column} is missing", missing))
+        checks.append((f"unknown {column}", outside & ~missing))
+
+    # Dates: the status date must parse, the arrival date must exist in the
+    # calendar and the status cannot precede the booking date
+    status_key = parse_day_keys(df['reservation_status_date'])
+    checks.append(("invalid reservation_status_date", status_key < 0))
+
+    arrival_month = month_numbers(df['arrival_date_month'])
+    year = numeric['arrival_date_year'].fillna(1970).to_numpy()
+    day = numeric['arrival_date_day_of_month'].fillna(1).to_numpy()
+    arrival_key = day_keys_from_parts(year, np.maximum(arrival_month, 1), day)
+    arrival_dates = pd.DatetimeIndex(keys_to_dates(arrival_key))
+    checks.append(("invalid arrival date", (day < 1) | (day > 31) | (arrival_dates.day != day)))
+
+    lead_time = numeric['lead_time']
+    booking_key = arrival_key - lead_time.fillna(0).to_numpy()
+    checks.append(("reservation status before booking date",
+                   lead_time.notna().to_numpy() & (status_key >= 0) & (status_key < booking_key)))
+
+    # One bit per rule, so the reasons are only spelled out per distinct combination
+    failed = np.zeros(len(df), dtype=np.uint64)
+    for bit, (_, mask) in enumerate(checks):
+        failed |= np.asarray(mask, dtype=np.uint64) << np.uint64(bit)
+    bad = failed != 0
+
+    codes, combinations = pd.factorize(failed[bad])
+    reason_names = np.array(['; '.join(name for bit, (name, _) in enumerate(checks) if combination >> bit & 1)
+                             for combination in combinations.tolist()], dtype=object)
+    rejected = df[bad].copy()
+    rejected.insert(0, 'line', source_lines(len(df), df.attrs.get('malformed_lines', []))[bad])
+    rejected['reasons'] = reason_names[codes] if len(codes) else []
+
+    malformed = pd.DataFrame(df.attrs.get('malformed_lines', []), columns=['line', 'reasons'])
+    rejected = pd.concat([rejected, malformed], ignore_index=True).sort_values('line', kind='stable')
+
+    bookings = df[~bad].reset_index(drop=True)
+    for column, values in numeric.items():
+        bookings[column] = values[~bad].to_numpy()
+    bookings[INTEGER_COLUMNS] = bookings[INTEGER_COLUMNS].astype(np.int64)
+    bookings['status_key'] = status_key[~bad]
+    bookings['arrival_month'] = arrival_month[~bad]
+    bookings['arrival_key'] = arrival_key[~bad]
+    bookings.attrs = {}
+    return bookings, rejected.reset_index(drop=True)
+
+
+def reason_counts(rejected):
+    """Number of rejected rows per individual reason"""
+    if rejected.empty:
+        return pd.Series(dtype=np.int64, name='rows')
+    reasons = rejected['reasons'].str.split('; ').explode()
+    reasons = reasons.str.replace(r'^expected \d+ fields, saw \d+$', 'wrong number of fields', regex=True)
+    return reasons.value_counts().rename('rows')